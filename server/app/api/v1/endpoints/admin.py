@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response, PlainTextResponse
+from app.models.schemas import (
+    ConversionType,
+    ProfilingSettings,
+    ProfilingStatus,
+    SchedulerMetrics
+)
+from app.core.security import require_admin
+from app.core.profiling import profile_store
+from app.core.workers import get_pool
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _status() -> ProfilingStatus:
+    return ProfilingStatus(
+        enabled=profile_store.enabled,
+        sample_rate=profile_store.sample_rate,
+        mode=profile_store.mode,
+        profiled=profile_store.summary()
+    )
+
+
+@router.get("/profiling", response_model=ProfilingStatus)
+async def get_profiling():
+    return _status()
+
+
+@router.put("/profiling", response_model=ProfilingStatus)
+async def update_profiling(config: ProfilingSettings):
+    profile_store.configure(config.enabled, config.sample_rate, config.mode.value)
+    return _status()
+
+
+@router.delete("/profiling", response_model=ProfilingStatus)
+async def reset_profiling():
+    profile_store.reset()
+    return _status()
+
+
+@router.get("/profiling/{conversion_type}/pstats")
+async def download_pstats(conversion_type: ConversionType):
+    data = profile_store.pstats_bytes(conversion_type.value)
+    
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No cProfile data for {conversion_type.value}"
+        )
+    
+    # Load with: pstats.Stats("<file>.pstats") or snakeviz
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="{conversion_type.value}.pstats"'
+        }
+    )
+
+
+@router.get("/profiling/{conversion_type}/collapsed")
+async def download_collapsed_stacks(conversion_type: ConversionType):
+    data = profile_store.collapsed_stacks(conversion_type.value)
+    
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No sampling data for {conversion_type.value}"
+        )
+    
+    # Feed to flamegraph.pl or drop into speedscope.app
+    return PlainTextResponse(
+        content=data,
+        headers={
+            "Content-Disposition": f'attachment; filename="{conversion_type.value}.collapsed.txt"'
+        }
+    )
+
+
+def _scheduler_metrics() -> SchedulerMetrics:
+    scheduler = get_pool().scheduler
+    return SchedulerMetrics(workers=scheduler.slots, clients=scheduler.metrics())
+
+
+@router.get("/metrics", response_model=SchedulerMetrics)
+async def get_metrics():
+    return _scheduler_metrics()
+
+
+@router.delete("/metrics", response_model=SchedulerMetrics)
+async def reset_metrics():
+    get_pool().scheduler.reset_metrics()
+    return _scheduler_metrics()
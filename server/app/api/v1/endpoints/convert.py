@@ -1,17 +1,39 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
 from fastapi.responses import FileResponse
-from app.models.schemas import ConversionResponse, ConversionType
+from typing import List, Optional
+from app.models.schemas import ConversionResponse, ConversionType, DocxEngine
 from app.utils.validators import validate_upload_file
 from app.utils.file_utils import (
     save_upload_file,
     generate_unique_filename,
     get_file_size,
-    delete_file
+    get_thumbnail_path,
+    delete_file,
+    delete_output_file
 )
 from app.services.pdf.image_to_pdf import convert_image_to_pdf
 from app.services.pdf.docx_to_pdf import convert_docx_to_pdf
+from app.services.pdf.libreoffice import convert_docx_with_libreoffice
 from app.services.pdf.text_to_pdf import convert_text_to_pdf
+from app.services.pdf.parallel import convert_text_in_parallel, convert_docx_in_parallel
+from app.services.pdf.xlsx_to_pdf import convert_xlsx_to_pdf
+from app.services.pdf.pptx_to_pdf import convert_pptx_to_pdf
+from app.services.pdf.pdf_operations import (
+    merge_pdfs,
+    split_pdf,
+    extract_pdf_pages,
+    PageRangeError
+)
 from app.core.config import settings
+from app.core.tracing import span, record_span, current_span
+from app.core.security import identify_client
+from app.core.scheduler import ANONYMOUS_CLIENT
+from app.core.workers import (
+    run_conversion,
+    ConversionTimeoutError,
+    ConversionResourceError,
+    WorkerCrashedError
+)
 import os
 import logging
 
@@ -20,42 +42,135 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.post("", response_model=ConversionResponse)
-async def convert_file(
-    file: UploadFile = File(..., description="File to convert"),
-    conversion_type: ConversionType = Form(..., description="Type of conversion")
-):  
-    # Validate the uploaded file
-    validate_upload_file(file, conversion_type.value)
-    
-    # Generate unique filenames
-    input_filename = generate_unique_filename(file.filename)
-    input_path = os.path.join(settings.upload_dir, input_filename)
-    
-    # Determine output extension based on conversion type
+def _output_extension(conversion_type: ConversionType) -> str:
+    """Determine output extension based on conversion type"""
     if "to_pdf" in conversion_type.value:
-        output_ext = ".pdf"
+        return ".pdf"
     elif conversion_type == ConversionType.PDF_TO_IMAGE:
-        output_ext = ".png"
-    else:
-        output_ext = ".pdf" 
+        return ".png"
+    elif conversion_type == ConversionType.PDF_SPLIT:
+        return ".zip"
+    return ".pdf"
+
+
+def _thumbnail_url(output_path: str, output_filename: str) -> Optional[str]:
+    """Preview URL for an output, if its converter managed to create one"""
+    if os.path.exists(get_thumbnail_path(output_path)):
+        return f"/api/v1/convert/thumbnail/{output_filename}"
+    return None
+
+
+async def perform_conversion(
+    conversion_type: ConversionType,
+    input_path: str,
+    original_filename: str,
+    page_ranges: Optional[str] = None,
+    client_id: str = ANONYMOUS_CLIENT,
+    engine: DocxEngine = DocxEngine.LIBREOFFICE
+) -> ConversionResponse:
+    """
+    Convert an input file that is already on disk.
     
-    output_filename = generate_unique_filename(file.filename, output_ext)
+    Shared by the one-shot /convert endpoint and resumable uploads.
+    The caller owns (and must delete) the input file.
+    """
+    # Queue position depends on who is asking and how big the input is
+    input_size = get_file_size(input_path)
+    
+    output_filename = generate_unique_filename(
+        original_filename,
+        _output_extension(conversion_type)
+    )
     output_path = os.path.join(settings.output_dir, output_filename)
     
     try:
-        # Save uploaded file
-        await save_upload_file(file, input_path)
-        logger.info(f"File uploaded: {input_filename}")
-        
         if conversion_type == ConversionType.IMAGE_TO_PDF:
-            convert_image_to_pdf(input_path, output_path)
+            await run_conversion(
+                convert_image_to_pdf,
+                input_path,
+                output_path,
+                thumbnail=settings.thumbnails_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
             
         elif conversion_type == ConversionType.DOCX_TO_PDF:
-            convert_docx_to_pdf(input_path, output_path)
+            # LibreOffice when its pool can take the file, ReportLab otherwise
+            converted = engine == DocxEngine.LIBREOFFICE and await convert_docx_with_libreoffice(
+                input_path,
+                output_path,
+                thumbnail=settings.thumbnails_enabled,
+                client_id=client_id,
+                input_size=input_size
+            )
+            
+            # Very large documents are laid out in parts on several workers
+            converted = converted or await convert_docx_in_parallel(
+                input_path,
+                output_path,
+                thumbnail=settings.thumbnails_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
+            
+            if not converted:
+                await run_conversion(
+                    convert_docx_to_pdf,
+                    input_path,
+                    output_path,
+                    thumbnail=settings.thumbnails_enabled,
+                    conversion_type=conversion_type.value,
+                    client_id=client_id,
+                    input_size=input_size
+                )
             
         elif conversion_type == ConversionType.TEXT_TO_PDF:
-            convert_text_to_pdf(input_path, output_path)
+            converted = await convert_text_in_parallel(
+                input_path,
+                output_path,
+                thumbnail=settings.thumbnails_enabled,
+                incremental=settings.text_incremental_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
+            
+            if not converted:
+                await run_conversion(
+                    convert_text_to_pdf,
+                    input_path,
+                    output_path,
+                    thumbnail=settings.thumbnails_enabled,
+                    incremental=settings.text_incremental_enabled,
+                    owner=client_id,
+                    conversion_type=conversion_type.value,
+                    client_id=client_id,
+                    input_size=input_size
+                )
+            
+        elif conversion_type == ConversionType.XLSX_TO_PDF:
+            await run_conversion(
+                convert_xlsx_to_pdf,
+                input_path,
+                output_path,
+                thumbnail=settings.thumbnails_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
+            
+        elif conversion_type == ConversionType.PPTX_TO_PDF:
+            await run_conversion(
+                convert_pptx_to_pdf,
+                input_path,
+                output_path,
+                thumbnail=settings.thumbnails_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
             
         elif conversion_type == ConversionType.PDF_TO_IMAGE:
             raise HTTPException(
@@ -63,6 +178,36 @@ async def convert_file(
                 detail="PDF to image conversion coming soon!"
             )
         
+        elif conversion_type == ConversionType.PDF_SPLIT:
+            await run_conversion(
+                split_pdf,
+                input_path,
+                output_path,
+                page_ranges,
+                thumbnail=settings.thumbnails_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
+            
+        elif conversion_type == ConversionType.PDF_EXTRACT_PAGES:
+            await run_conversion(
+                extract_pdf_pages,
+                input_path,
+                output_path,
+                page_ranges,
+                thumbnail=settings.thumbnails_enabled,
+                conversion_type=conversion_type.value,
+                client_id=client_id,
+                input_size=input_size
+            )
+            
+        elif conversion_type == ConversionType.PDF_MERGE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use /convert/merge to merge multiple PDFs"
+            )
+        
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -78,13 +223,99 @@ async def convert_file(
             message="Conversion completed successfully",
             output_filename=output_filename,
             download_url=f"/api/v1/convert/download/{output_filename}",
-            file_size=file_size
+            file_size=file_size,
+            thumbnail_url=_thumbnail_url(output_path, output_filename)
         )
     
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     
+    except PageRangeError as e:
+        # Invalid page ranges are the client's fault, not a server error
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    except ConversionTimeoutError as e:
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    
+    except ConversionResourceError as e:
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    
+    except WorkerCrashedError as e:
+        # The worker has already been replaced, so a retry can succeed
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{e}, please try again",
+            headers={"Retry-After": "1"}
+        )
+    
+    except Exception as e:
+        logger.error(f"Conversion failed: {e}")
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Conversion failed: {str(e)}"
+        )
+
+
+@router.post("", response_model=ConversionResponse)
+async def convert_file(
+    file: UploadFile = File(..., description="File to convert"),
+    conversion_type: ConversionType = Form(..., description="Type of conversion"),
+    page_ranges: Optional[str] = Form(
+        None,
+        description="Page ranges for pdf_split / pdf_extract_pages, e.g. '1-3,5'"
+    ),
+    engine: DocxEngine = Form(
+        DocxEngine.LIBREOFFICE,
+        description="Engine for docx_to_pdf (falls back to reportlab if LibreOffice is unavailable)"
+    ),
+    client_id: str = Depends(identify_client)
+):  
+    # The multipart body has been received by the time we get here
+    record_span("upload")
+    current_span().set_attribute("conversion.type", conversion_type.value)
+    current_span().set_attribute("file.size", file.size or 0)
+    
+    # Validate the uploaded file
+    with span("validate"):
+        validate_upload_file(file, conversion_type.value)
+    
+    # Generate unique filenames
+    input_filename = generate_unique_filename(file.filename)
+    input_path = os.path.join(settings.upload_dir, input_filename)
+    
+    try:
+        # Save uploaded file
+        with span("save"):
+            await save_upload_file(file, input_path)
+        logger.info(f"File uploaded: {input_filename}")
+        
+        return await perform_conversion(
+            conversion_type,
+            input_path,
+            file.filename,
+            page_ranges,
+            client_id,
+            engine
+        )
+    
+    except HTTPException:
+        raise
+    
     except Exception as e:
         logger.error(f"Conversion failed: {e}")
         raise HTTPException(
@@ -96,7 +327,108 @@ async def convert_file(
         # Clean up uploaded file
         # Senior Dev Tip: Always clean up temporary files
         # Use finally to ensure it happens even if errors occur
-        delete_file(input_path)
+        with span("cleanup"):
+            delete_file(input_path)
+
+
+@router.post("/merge", response_model=ConversionResponse)
+async def merge_files(
+    files: List[UploadFile] = File(..., description="PDF files to merge, in order"),
+    client_id: str = Depends(identify_client)
+):
+    if len(files) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least two PDF files are required for merging"
+        )
+    
+    if len(files) > settings.max_merge_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot merge more than {settings.max_merge_files} files"
+        )
+    
+    record_span("upload")
+    current_span().set_attribute("conversion.type", ConversionType.PDF_MERGE.value)
+    current_span().set_attribute("file.size", sum(file.size or 0 for file in files))
+    
+    # Validate every file before saving any of them
+    with span("validate"):
+        for file in files:
+            validate_upload_file(file, ConversionType.PDF_MERGE.value)
+    
+    input_paths = [
+        os.path.join(settings.upload_dir, generate_unique_filename(file.filename))
+        for file in files
+    ]
+    output_filename = generate_unique_filename(files[0].filename, ".pdf")
+    output_path = os.path.join(settings.output_dir, output_filename)
+    
+    try:
+        with span("save"):
+            for file, input_path in zip(files, input_paths):
+                await save_upload_file(file, input_path)
+        logger.info(f"Files uploaded for merge: {len(input_paths)}")
+        
+        await run_conversion(
+            merge_pdfs,
+            input_paths,
+            output_path,
+            thumbnail=settings.thumbnails_enabled,
+            conversion_type=ConversionType.PDF_MERGE.value,
+            client_id=client_id,
+            input_size=sum(get_file_size(input_path) for input_path in input_paths)
+        )
+        
+        file_size = get_file_size(output_path)
+        
+        return ConversionResponse(
+            success=True,
+            message="Merge completed successfully",
+            output_filename=output_filename,
+            download_url=f"/api/v1/convert/download/{output_filename}",
+            file_size=file_size,
+            thumbnail_url=_thumbnail_url(output_path, output_filename)
+        )
+    
+    except HTTPException:
+        raise
+    
+    except ConversionTimeoutError as e:
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    
+    except ConversionResourceError as e:
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    
+    except WorkerCrashedError as e:
+        # The worker has already been replaced, so a retry can succeed
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{e}, please try again",
+            headers={"Retry-After": "1"}
+        )
+    
+    except Exception as e:
+        logger.error(f"Merge failed: {e}")
+        delete_output_file(output_path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Merge failed: {str(e)}"
+        )
+    
+    finally:
+        with span("cleanup"):
+            for input_path in input_paths:
+                delete_file(input_path)
 
 
 @router.get("/download/{filename}")
@@ -123,3 +455,33 @@ async def download_file(filename: str):
         filename=filename,
         media_type='application/octet-stream'
     )
+
+
+@router.get("/thumbnail/{filename}")
+async def download_thumbnail(filename: str):
+    """
+    Serve the first-page preview of a converted file.
+    
+    Senior Dev Tip: Output names are random UUIDs and never reused, so the
+    preview behind a URL can never change - browsers and CDNs may cache it
+    for good instead of asking again.
+    """
+    if ".." in filename or "/" in filename or "\\" in filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid filename"
+        )
+    
+    thumbnail_path = get_thumbnail_path(os.path.join(settings.output_dir, filename))
+    
+    if not os.path.exists(thumbnail_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not found"
+        )
+    
+    return FileResponse(
+        path=thumbnail_path,
+        media_type='image/png',
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
@@ -0,0 +1,205 @@
+"""
+Resumable upload endpoints.
+
+Protocol (modelled on tus):
+1. POST   /uploads                 -> create a session, returns its URL
+2. PATCH  /uploads/{id}            -> append a chunk; Upload-Offset header
+                                      must match the current offset
+3. HEAD   /uploads/{id}            -> current Upload-Offset (to resume)
+4. POST   /uploads/{id}/convert    -> convert the completed upload
+   DELETE /uploads/{id}            -> abandon the upload
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from starlette.requests import ClientDisconnect
+from typing import Optional
+from app.models.schemas import (
+    ConversionResponse,
+    ConversionType,
+    DocxEngine,
+    UploadCreateRequest,
+    UploadFinalizeRequest,
+    UploadSessionResponse
+)
+from app.utils.validators import validate_file_type
+from app.utils.file_utils import delete_file
+from app.utils import upload_sessions
+from app.api.v1.endpoints.convert import perform_conversion
+from app.core.config import settings
+from app.core.security import identify_client
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _check_session(session: Optional[dict], client_id: str) -> dict:
+    # Another client's session looks the same as one that doesn't exist
+    if session is None or session.get("client_id") != client_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found or expired"
+        )
+    return session
+
+
+def _get_session(upload_id: str, client_id: str) -> dict:
+    return _check_session(upload_sessions.load_session(upload_id), client_id)
+
+
+def _session_response(session: dict) -> UploadSessionResponse:
+    upload_id = session["upload_id"]
+    return UploadSessionResponse(
+        upload_id=upload_id,
+        upload_url=f"/api/v1/uploads/{upload_id}",
+        offset=upload_sessions.current_offset(upload_id),
+        length=session["length"],
+        conversion_type=session["conversion_type"],
+        expires_at=upload_sessions.expires_at(upload_id)
+    )
+
+
+def _offset_headers(session: dict, offset: int) -> dict:
+    return {
+        "Upload-Offset": str(offset),
+        "Upload-Length": str(session["length"]),
+        "Cache-Control": "no-store"
+    }
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UploadSessionResponse
+)
+async def create_upload(
+    body: UploadCreateRequest,
+    response: Response,
+    # Rejects callers without a valid key before they upload anything
+    client_id: str = Depends(identify_client)
+):
+    # Same checks as a one-shot upload, but against the declared length
+    validate_file_type(body.filename, body.conversion_type.value)
+    
+    if body.conversion_type == ConversionType.PDF_MERGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use /convert/merge to merge multiple PDFs"
+        )
+    
+    if body.length > settings.max_file_size:
+        max_size_mb = settings.max_file_size / (1024 * 1024)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {max_size_mb}MB"
+        )
+    
+    session = upload_sessions.create_session(
+        body.filename,
+        body.conversion_type.value,
+        body.length,
+        client_id
+    )
+    result = _session_response(session)
+    
+    response.headers["Location"] = result.upload_url
+    response.headers["Upload-Offset"] = "0"
+    return result
+
+
+@router.head("/{upload_id}")
+async def get_upload_offset(upload_id: str, client_id: str = Depends(identify_client)):
+    session = _get_session(upload_id, client_id)
+    offset = upload_sessions.current_offset(upload_id)
+    return Response(status_code=status.HTTP_200_OK, headers=_offset_headers(session, offset))
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(upload_id: str, client_id: str = Depends(identify_client)):
+    return _session_response(_get_session(upload_id, client_id))
+
+
+@router.patch("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., description="Offset this chunk starts at"),
+    client_id: str = Depends(identify_client)
+):
+    # One writer at a time, in whichever server process the request lands
+    async with upload_sessions.locked_session(upload_id) as session:
+        session = _check_session(session, client_id)
+        offset = upload_sessions.current_offset(upload_id)
+        
+        # The client must resume exactly where the server left off
+        if upload_offset != offset:
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content={"detail": f"Upload-Offset mismatch, expected {offset}"},
+                headers=_offset_headers(session, offset)
+            )
+        
+        try:
+            offset = await upload_sessions.append_chunks(session, request.stream())
+        except upload_sessions.UploadOverflowError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        except ClientDisconnect:
+            # Whatever arrived is on disk; the client resumes with HEAD
+            offset = upload_sessions.current_offset(upload_id)
+            logger.info(f"Upload {upload_id} interrupted at offset {offset}")
+    
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers=_offset_headers(session, offset)
+    )
+
+
+@router.post("/{upload_id}/convert", response_model=ConversionResponse)
+async def finalize_upload(
+    upload_id: str,
+    body: Optional[UploadFinalizeRequest] = None,
+    client_id: str = Depends(identify_client)
+):
+    async with upload_sessions.locked_session(upload_id) as session:
+        session = _check_session(session, client_id)
+        offset = upload_sessions.current_offset(upload_id)
+        if offset != session["length"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: {offset} of {session['length']} bytes received"
+            )
+        
+        input_path = await asyncio.to_thread(upload_sessions.link_for_conversion, session)
+        try:
+            result = await perform_conversion(
+                ConversionType(session["conversion_type"]),
+                input_path,
+                session["filename"],
+                body.page_ranges if body else None,
+                # Billed (quotas, checkpoints) to the client that created it
+                session["client_id"],
+                body.engine if body else DocxEngine.LIBREOFFICE
+            )
+        finally:
+            delete_file(input_path)
+        
+        # On failure the session is kept, so the client can retry
+        # (e.g. with different page ranges) without re-uploading
+        upload_sessions.delete_session(upload_id)
+    
+    return result
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_upload(upload_id: str, client_id: str = Depends(identify_client)):
+    async with upload_sessions.locked_session(upload_id) as session:
+        _check_session(session, client_id)
+        upload_sessions.delete_session(upload_id)
+    
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
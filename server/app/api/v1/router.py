@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, convert
+from app.api.v1.endpoints import health, convert, uploads, admin
 
 # Create the main API router for v1
 api_router = APIRouter()
@@ -15,3 +15,15 @@ api_router.include_router(
     prefix="/convert",
     tags=["Conversion"]
 )
+
+api_router.include_router(
+    uploads.router,
+    prefix="/uploads",
+    tags=["Uploads"]
+)
+
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["Admin"]
+)
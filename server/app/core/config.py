@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import List, Union
+from typing import Dict, List, Literal, Optional, Union
 import os
 
 
@@ -29,15 +29,164 @@ class Settings(BaseSettings):
         description="Maximum file size in bytes"
     )
     
+    # Maximum number of PDFs accepted by a single merge request
+    max_merge_files: int = Field(
+        default=200,
+        description="Maximum number of files in a PDF merge"
+    )
+    
     # File Storage Paths
     upload_dir: str = Field(default="uploads", description="Upload directory")
     output_dir: str = Field(default="outputs", description="Output directory")
     
+    # Conversion Worker Pool
+    conversion_workers: int = Field(
+        default=2,  # keep memory low on the free tier
+        description="Number of worker processes used for conversions"
+    )
+    conversion_timeout_seconds: float = Field(
+        default=60,
+        description="Kill a conversion that runs longer than this"
+    )
+    worker_memory_limit_mb: int = Field(
+        default=1024,
+        description="Address space limit per worker process in MB (0 = no limit)"
+    )
+    worker_max_tasks: int = Field(
+        default=200,
+        description="Recycle a worker after this many conversions"
+    )
+    max_image_pixels: int = Field(
+        default=50_000_000,
+        description="Reject images with more pixels than this (decompression bomb guard)"
+    )
+    
+    # Clients and fair scheduling
+    api_keys: Dict[str, str] = Field(
+        default={},
+        description="API keys (X-API-Key header) mapped to client names"
+    )
+    require_api_key: bool = Field(
+        default=False,
+        description="Reject conversions without a valid API key"
+    )
+    client_weights: Dict[str, float] = Field(
+        default={},
+        description="Fair queuing weight per client name (default 1.0)"
+    )
+    client_max_concurrent_conversions: int = Field(
+        default=0,
+        description="Default per-client limit on running conversions (0 = no limit)"
+    )
+    client_concurrency_limits: Dict[str, int] = Field(
+        default={},
+        description="Per-client overrides of client_max_concurrent_conversions"
+    )
+    interactive_max_bytes: int = Field(
+        default=1024 * 1024,
+        description="Inputs up to this size go to the interactive (priority) lane"
+    )
+    
+    # LibreOffice DOCX engine (optional, needs unoserver + LibreOffice)
+    libreoffice_pool_size: int = Field(
+        default=0,
+        description="Warm LibreOffice daemons for DOCX conversion (0 = disabled)"
+    )
+    libreoffice_command: str = Field(
+        default="unoserver",
+        description="unoserver command used to start each daemon"
+    )
+    libreoffice_executable: Optional[str] = Field(
+        default=None,
+        description="Path to the soffice executable (default: found by unoserver)"
+    )
+    libreoffice_memory_limit_mb: int = Field(
+        default=2048,  # soffice maps far more than it touches
+        description="Address space limit per LibreOffice daemon in MB (0 = no limit)"
+    )
+    libreoffice_start_timeout_seconds: float = Field(
+        default=60,
+        description="Give up on a daemon that isn't ready after this long"
+    )
+    
+    # Incremental text rendering (growing log files)
+    text_incremental_enabled: bool = Field(
+        default=True,
+        description="Reuse finished pages when a text file is converted again after growing"
+    )
+    
+    # Parallel rendering of very large text/DOCX files
+    parallel_render_enabled: bool = Field(
+        default=True,
+        description="Render large text and DOCX files in parts on several workers"
+    )
+    parallel_render_chunk_bytes: int = Field(
+        default=2 * 1024 * 1024,  # 2MB, a few seconds of layout
+        description="Least text per part; files with less than two parts' worth render in one piece"
+    )
+    parallel_render_min_docx_bytes: int = Field(
+        default=512 * 1024,  # DOCX is zipped, so far less than two parts of text
+        description="Smaller DOCX files are never split (checking costs a parse)"
+    )
+    
+    # Preview thumbnails (first page, PNG, stored next to the output)
+    thumbnails_enabled: bool = Field(default=True, description="Create a first-page thumbnail")
+    thumbnail_size: int = Field(
+        default=256,
+        description="Longest side of a thumbnail in pixels"
+    )
+    
     # File Cleanup
     cleanup_after_minutes: int = Field(
         default=30,
         description="Delete files after X minutes"
     )
+    cleanup_interval_minutes: int = Field(
+        default=5,
+        description="How often the background cleanup runs"
+    )
+    
+    # Resumable Uploads
+    upload_session_ttl_minutes: int = Field(
+        default=60,
+        description="Reclaim upload sessions idle for longer than this"
+    )
+    
+    # Tracing (OTLP/JSON spans)
+    tracing_enabled: bool = Field(default=False, description="Record request traces")
+    tracing_sample_rate: float = Field(
+        default=1.0,
+        description="Fraction of requests to trace (0.0 - 1.0)"
+    )
+    tracing_exporter: str = Field(
+        default="console",
+        description="Where to export traces: 'console' or 'file'"
+    )
+    tracing_file: str = Field(
+        default="traces.jsonl",
+        description="Trace output file when tracing_exporter is 'file'"
+    )
+    
+    # Admin endpoints (profiling) - disabled unless a token is set
+    admin_token: Optional[str] = Field(
+        default=None,
+        description="Token required in the X-Admin-Token header for admin endpoints"
+    )
+    
+    # Profiling defaults (can be changed at runtime via the admin API)
+    profiling_enabled: bool = Field(default=False, description="Profile sampled conversions")
+    profiling_sample_rate: float = Field(
+        default=0.05,
+        description="Fraction of conversions to profile (0.0 - 1.0)"
+    )
+    profiling_mode: Literal["cprofile", "sampling"] = Field(
+        default="sampling",
+        description="'cprofile' (exact, slower) or 'sampling' (stack samples, cheap)"
+    )
+    profiling_interval_ms: float = Field(
+        default=5,
+        description="Stack sampling interval in milliseconds"
+    )
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,182 @@
+"""
+Conversion Profiling
+
+Samples a fraction of conversions and aggregates their profiles per
+conversion type, so regressions inside ReportLab's build() or Pillow's
+decoders can be inspected in production without a redeploy.
+
+Two modes are available:
+- "cprofile": deterministic cProfile of the whole conversion. Exact call
+  counts, served as a .pstats file (snakeviz, pstats, gprof2dot...).
+- "sampling": a background thread records the converter's call stack
+  every few milliseconds. Much lower overhead; served as collapsed
+  stacks ready for flamegraph.pl / speedscope.
+
+Senior Dev Tip: Profiling runs inside the worker process that does the
+conversion; only the (small) aggregated data travels back to the API
+process. Stats are kept per API process and reset on restart.
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+import cProfile
+import marshal
+import pstats
+import random
+import sys
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODE_CPROFILE = "cprofile"
+MODE_SAMPLING = "sampling"
+
+
+class _StackSampler(threading.Thread):
+    """Periodically records the call stack of another thread."""
+
+    def __init__(self, thread_id: int, interval: float, stop_at):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        # Frames above this code object (worker plumbing) are not recorded
+        self.stop_at = stop_at
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None and frame.f_code is not self.stop_at:
+                code = frame.f_code
+                module = frame.f_globals.get("__name__", "?")
+                names.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def run_profiled(
+    mode: str,
+    interval_ms: float,
+    func: Callable[..., Any],
+    args: tuple,
+    kwargs: dict
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run func inside a worker under the given profiler.
+
+    Returns (result, profile) where profile is {"mode": ..., "data": ...}:
+    raw cProfile stats for "cprofile", {stack: count} for "sampling".
+    """
+    if mode == MODE_SAMPLING:
+        sampler = _StackSampler(
+            threading.get_ident(),
+            interval_ms / 1000,
+            stop_at=sys._getframe().f_code
+        )
+        sampler.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            sampler.stop()
+        return result, {"mode": mode, "data": dict(sampler.stacks)}
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, {"mode": MODE_CPROFILE, "data": profiler.stats}
+
+
+class _RawStats:
+    """Adapter so pstats.Stats can load a raw stats dict."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class ProfileStore:
+    """
+    Profiling switch plus aggregated results, keyed by conversion type.
+
+    Senior Dev Tip: The switch lives here (not in Settings) so admins can
+    flip it at runtime; Settings only provides the startup defaults.
+    """
+
+    def __init__(self):
+        self.enabled = settings.profiling_enabled
+        self.sample_rate = settings.profiling_sample_rate
+        self.mode = settings.profiling_mode
+        self._lock = threading.Lock()
+        self._pstats: Dict[str, pstats.Stats] = {}
+        self._stacks: Dict[str, Counter] = {}
+        self._counts: Counter = Counter()
+
+    def configure(self, enabled: bool, sample_rate: float, mode: str) -> None:
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.mode = mode
+        logger.info(f"Profiling {'enabled' if enabled else 'disabled'} ({mode}, rate={sample_rate})")
+
+    def choose_mode(self) -> Optional[str]:
+        """Decide whether to profile the next conversion, and how."""
+        if self.enabled and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    def record(self, conversion_type: str, profile: Dict[str, Any]) -> None:
+        """Merge one conversion's profile into the aggregate."""
+        with self._lock:
+            self._counts[conversion_type] += 1
+
+            if profile["mode"] == MODE_SAMPLING:
+                self._stacks.setdefault(conversion_type, Counter()).update(profile["data"])
+                return
+
+            stats = pstats.Stats(_RawStats(profile["data"]))
+            if conversion_type in self._pstats:
+                self._pstats[conversion_type].add(stats)
+            else:
+                self._pstats[conversion_type] = stats
+
+    def summary(self) -> Dict[str, int]:
+        """Number of profiled conversions per type."""
+        with self._lock:
+            return dict(self._counts)
+
+    def pstats_bytes(self, conversion_type: str) -> Optional[bytes]:
+        """Aggregated cProfile stats in the .pstats (marshal) file format."""
+        with self._lock:
+            stats = self._pstats.get(conversion_type)
+            return marshal.dumps(stats.stats) if stats else None
+
+    def collapsed_stacks(self, conversion_type: str) -> Optional[str]:
+        """Aggregated samples as collapsed stacks ("a;b;c count" per line)."""
+        with self._lock:
+            stacks = self._stacks.get(conversion_type)
+            if not stacks:
+                return None
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pstats.clear()
+            self._stacks.clear()
+            self._counts.clear()
+
+
+profile_store = ProfileStore()
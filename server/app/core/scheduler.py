@@ -0,0 +1,268 @@
+"""
+Fair Conversion Scheduler
+
+Decides which waiting conversion gets the next free worker.
+
+- Weighted fair queuing: every job gets a virtual finish time of
+  max(virtual clock, client's previous finish) + cost / weight, and the
+  job with the smallest finish time runs next. A client with hundreds of
+  queued DOCX files gets its weighted share of the workers, not all of
+  them, and a newcomer's first job is never stuck behind that backlog.
+- Priority lanes: small inputs go to the interactive lane, which is always
+  served before the bulk lane.
+- Per-client quotas: a client never holds more workers than its
+  concurrency limit, even if the rest of the pool is idle.
+
+Clients with nothing queued or running are kept for the metrics for a
+while and then forgotten, so one entry per anonymous host doesn't pile
+up forever. Only clients with waiting jobs are looked at on dispatch.
+
+Senior Dev Tip: All scheduler state lives on the event loop thread.
+Workers finish on pool threads, which hand the release back with
+loop.call_soon_threadsafe, so no locks are needed here.
+"""
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+from app.core.config import settings
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+
+# Lanes in the order they are served
+LANES = (LANE_INTERACTIVE, LANE_BULK)
+
+ANONYMOUS_CLIENT = "anonymous"
+
+# Input size that counts as one unit of work for fair queuing
+_COST_UNIT_BYTES = 1024 * 1024
+
+# Forget a client's counters this long after its last job finished
+_IDLE_CLIENT_TTL_SECONDS = 10 * 60
+
+
+def client_weight(client_id: str) -> float:
+    """Share of the workers a client gets relative to others (default 1)."""
+    return settings.client_weights.get(client_id, 1.0)
+
+
+def client_quota(client_id: str) -> int:
+    """Maximum number of concurrent conversions for a client (0 = no limit)."""
+    return settings.client_concurrency_limits.get(
+        client_id,
+        settings.client_max_concurrent_conversions
+    )
+
+
+def choose_lane(input_size: int) -> str:
+    """Small inputs are interactive, everything else is bulk."""
+    if input_size <= settings.interactive_max_bytes:
+        return LANE_INTERACTIVE
+    return LANE_BULK
+
+
+@dataclass
+class _Job:
+    client_id: str
+    lane: str
+    finish: float
+    enqueued_at: float
+    future: asyncio.Future
+
+
+@dataclass
+class ClientStats:
+    """Queue counters for one client."""
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    # Finish time of the client's latest job, per lane
+    last_finish: Dict[str, float] = field(default_factory=dict)
+    # Waiting jobs per lane, oldest first
+    jobs: Dict[str, Deque[_Job]] = field(
+        default_factory=lambda: {lane: deque() for lane in LANES}
+    )
+
+
+class FairScheduler:
+    """
+    Hands out a fixed number of worker slots to waiting conversions.
+
+    Usage:
+        await scheduler.acquire(client_id, input_size)
+        try: ...run the conversion...
+        finally: scheduler.release(client_id)
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._free = slots
+        self._clients: Dict[str, ClientStats] = {}
+        # Clients with at least one queued job - the only ones _next_job scans
+        self._waiting: Dict[str, ClientStats] = {}
+        # Clients with nothing queued or running, by when they went idle
+        self._idle: "OrderedDict[str, float]" = OrderedDict()
+        # Virtual clock per lane: finish time of the last job dispatched
+        self._clock: Dict[str, float] = {lane: 0.0 for lane in LANES}
+
+    def _stats(self, client_id: str) -> ClientStats:
+        self._idle.pop(client_id, None)
+        if client_id not in self._clients:
+            self._clients[client_id] = ClientStats()
+        return self._clients[client_id]
+
+    def _settle(self, client_id: str, stats: ClientStats) -> None:
+        """Update the waiting and idle sets after a client's counters changed."""
+        if stats.queued:
+            self._waiting[client_id] = stats
+            return
+        self._waiting.pop(client_id, None)
+
+        if not stats.running:
+            # Dropping last_finish with the stats is safe: every job of an
+            # idle client has been dispatched, so the lane clock has caught up
+            self._idle[client_id] = time.monotonic()
+            self._idle.move_to_end(client_id)
+            self._forget_idle()
+
+    def _forget_idle(self) -> None:
+        """Drop clients that have been idle for longer than the TTL."""
+        cutoff = time.monotonic() - _IDLE_CLIENT_TTL_SECONDS
+        while self._idle:
+            client_id, idle_since = next(iter(self._idle.items()))
+            if idle_since > cutoff:
+                return
+            del self._idle[client_id]
+            del self._clients[client_id]
+
+    async def acquire(self, client_id: str, input_size: int = 0) -> float:
+        """
+        Wait until the scheduler gives this client a worker slot.
+
+        Args:
+            client_id: Client the conversion runs for
+            input_size: Total input size in bytes (cost and lane)
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        stats = self._stats(client_id)
+        lane = choose_lane(input_size)
+        cost = 1 + input_size / _COST_UNIT_BYTES
+
+        start = max(self._clock[lane], stats.last_finish.get(lane, 0.0))
+        job = _Job(
+            client_id=client_id,
+            lane=lane,
+            finish=start + cost / client_weight(client_id),
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future()
+        )
+        stats.last_finish[lane] = job.finish
+        stats.jobs[lane].append(job)
+        stats.queued += 1
+        self._settle(client_id, stats)
+
+        self._dispatch()
+
+        try:
+            await job.future
+        except asyncio.CancelledError:
+            if job.future.cancelled():
+                # Gave up while still queued (unless _dispatch already
+                # dropped it)
+                if job in stats.jobs[lane]:
+                    stats.jobs[lane].remove(job)
+                    stats.queued -= 1
+                    self._settle(client_id, stats)
+            else:
+                # Dispatched and cancelled in the same tick - hand the slot back
+                self.release(client_id)
+            raise
+
+        return time.monotonic() - job.enqueued_at
+
+    def release(self, client_id: str) -> None:
+        """Return a slot taken by acquire() and start the next job."""
+        stats = self._clients[client_id]
+        stats.running -= 1
+        stats.completed += 1
+        self._free += 1
+        self._settle(client_id, stats)
+        self._dispatch()
+
+    def _next_job(self) -> Optional[_Job]:
+        """Job with the smallest finish time in the first non-blocked lane."""
+        for lane in LANES:
+            best: Optional[_Job] = None
+            for client_id, stats in self._waiting.items():
+                quota = client_quota(client_id)
+                if quota and stats.running >= quota:
+                    continue
+                # A client's jobs within a lane are in finish time order
+                if stats.jobs[lane] and (best is None or stats.jobs[lane][0].finish < best.finish):
+                    best = stats.jobs[lane][0]
+            if best is not None:
+                return best
+        return None
+
+    def _dispatch(self) -> None:
+        while self._free > 0:
+            job = self._next_job()
+            if job is None:
+                return
+
+            stats = self._clients[job.client_id]
+            stats.jobs[job.lane].popleft()
+            stats.queued -= 1
+
+            # The waiter was cancelled but hasn't run its cleanup yet
+            if job.future.cancelled():
+                self._settle(job.client_id, stats)
+                continue
+
+            stats.running += 1
+            self._settle(job.client_id, stats)
+            self._free -= 1
+            self._clock[job.lane] = job.finish
+
+            wait = time.monotonic() - job.enqueued_at
+            stats.wait_seconds_total += wait
+            stats.wait_seconds_max = max(stats.wait_seconds_max, wait)
+
+            job.future.set_result(None)
+
+    def metrics(self) -> Dict[str, dict]:
+        """Per-client queue metrics."""
+        return {
+            client_id: {
+                "queued": stats.queued,
+                "running": stats.running,
+                "completed": stats.completed,
+                "wait_seconds_total": round(stats.wait_seconds_total, 6),
+                "wait_seconds_max": round(stats.wait_seconds_max, 6),
+                "wait_seconds_avg": round(
+                    stats.wait_seconds_total / (stats.completed + stats.running), 6
+                ) if stats.completed + stats.running else 0.0
+            }
+            for client_id, stats in self._clients.items()
+        }
+
+    def reset_metrics(self) -> None:
+        """Forget idle clients and zero the counters of active ones."""
+        for client_id in self._idle:
+            del self._clients[client_id]
+        self._idle.clear()
+
+        for stats in self._clients.values():
+            stats.completed = 0
+            stats.wait_seconds_total = 0.0
+            stats.wait_seconds_max = 0.0
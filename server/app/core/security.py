@@ -1 +1,77 @@
-# (future auth, limits)
+"""
+Security Helpers
+
+FastAPI dependencies that guard privileged endpoints and tell callers
+apart.
+
+Senior Dev Tip: Keep auth checks in dependencies so endpoints declare
+what they need (Depends(require_admin)) instead of re-implementing it.
+"""
+
+from fastapi import Header, HTTPException, Request, status
+from typing import Optional
+from app.core.config import settings
+from app.core.scheduler import ANONYMOUS_CLIENT
+import secrets
+
+
+def identify_client(request: Request, x_api_key: Optional[str] = Header(None)) -> str:
+    """
+    Work out which client a request belongs to.
+
+    Clients with an API key (X-API-Key header) are identified by the name
+    the key is mapped to in settings.api_keys. Without a key, each remote
+    address is its own anonymous client, unless keys are required.
+
+    Returns:
+        Client name used for scheduling and metrics
+
+    Raises:
+        HTTPException: 401 if the key is unknown, or missing while required
+    """
+    if x_api_key:
+        # Check every key so the response time doesn't depend on which matched
+        client_id = None
+        for key, name in settings.api_keys.items():
+            if secrets.compare_digest(x_api_key, key):
+                client_id = name
+
+        if client_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key"
+            )
+        return client_id
+
+    if settings.require_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API key required"
+        )
+
+    if request.client is None:
+        return ANONYMOUS_CLIENT
+    return f"{ANONYMOUS_CLIENT}:{request.client.host}"
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow the request only if it carries the configured admin token.
+
+    Raises:
+        HTTPException: 404 if admin endpoints are disabled (no token set),
+            401 if the token is missing or wrong
+    """
+    if not settings.admin_token:
+        # Don't advertise admin endpoints that aren't configured
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+
+    # compare_digest avoids leaking the token through timing
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token"
+        )
@@ -0,0 +1,290 @@
+"""
+Request Tracing
+
+Lightweight span tracing that exports OpenTelemetry (OTLP/JSON) records.
+
+Senior Dev Tip: Logs tell you *that* something happened, spans tell you
+*where the time went*. Every sampled request becomes one trace: a root
+span opened by the HTTP middleware and child spans for upload,
+validation, saving, queue wait, conversion and cleanup. Spans recorded
+inside worker processes are shipped back with the result and stitched
+into the same trace.
+
+Each finished trace is written as one line in the OTLP/JSON format used
+by the OpenTelemetry Collector's file exporter/receiver, so traces can be
+replayed into Jaeger, Tempo, etc. without adding the OTel SDK here.
+
+When tracing is off (or a request isn't sampled) every span() call
+returns the same no-op object, so instrumentation costs a context
+variable lookup and nothing else.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+import json
+import random
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+# (trace_id, span_id) of a span, used to continue a trace in a worker
+SpanContext = Tuple[str, str]
+
+_export_lock = threading.Lock()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value the way OTLP/JSON expects it."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _Trace:
+    """Collects the finished spans of one trace until it is exported."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Dict[str, Any]] = []
+
+
+class _NoopSpan:
+    """Stand-in returned when nothing is being recorded."""
+
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def context(self) -> Optional[SpanContext]:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace. Use as a context manager."""
+
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        trace: _Trace,
+        parent_id: Optional[str],
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        span_id: Optional[str] = None
+    ):
+        self.name = name
+        self.trace = trace
+        self.span_id = span_id or f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.kind = kind
+        self.start_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.finish(time.time_ns())
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def context(self) -> SpanContext:
+        return (self.trace.trace_id, self.span_id)
+
+    def finish(self, end_ns: int) -> None:
+        """Record the span in its trace."""
+        record = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": STATUS_ERROR, "message": self.error}
+                if self.error else {"code": STATUS_UNSET}
+            ),
+        }
+        if self.parent_id:
+            record["parentSpanId"] = self.parent_id
+        self.trace.spans.append(record)
+
+
+class _RootSpan(Span):
+    """Root span of a trace; exports the whole trace when it ends."""
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        _export(self.trace)
+        return False
+
+
+def start_trace(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Start a new trace, subject to sampling.
+
+    Args:
+        name: Name of the root span (e.g. "POST /api/v1/convert")
+        attributes: Initial root span attributes
+
+    Returns:
+        A span to use as a context manager (a no-op if not sampled)
+    """
+    if not settings.tracing_enabled or random.random() >= settings.tracing_sample_rate:
+        return NOOP_SPAN
+
+    trace = _Trace(f"{random.getrandbits(128):032x}")
+    return _RootSpan(name, trace, None, attributes, kind=SPAN_KIND_SERVER)
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Start a child span of the current span.
+
+    Args:
+        name: Span name (e.g. "validate", "layout")
+        attributes: Span attributes
+
+    Returns:
+        A span to use as a context manager (a no-op outside a sampled trace)
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace, parent.span_id, attributes)
+
+
+def current_span():
+    """Return the active span, or the no-op span if there is none."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def record_span(
+    name: str,
+    start_ns: Optional[int] = None,
+    attributes: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Record a child span that already happened, ending now.
+
+    Useful for work done before our code got control (e.g. the framework
+    receiving the multipart upload before the endpoint is called).
+
+    Args:
+        name: Span name
+        start_ns: Start time in ns since the epoch (default: when the
+            current span started)
+        attributes: Span attributes
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+    finished = Span(name, parent.trace, parent.span_id, attributes)
+    finished.start_ns = start_ns if start_ns is not None else parent.start_ns
+    finished.finish(time.time_ns())
+
+
+def add_remote_spans(spans: List[Dict[str, Any]]) -> None:
+    """Attach spans recorded in another process to the current trace."""
+    parent = _current_span.get()
+    if parent is not None and spans:
+        parent.trace.spans.extend(spans)
+
+
+def run_traced(
+    parent: SpanContext,
+    func: Callable[..., Any],
+    args: tuple,
+    kwargs: dict
+) -> Tuple[Any, List[Dict[str, Any]]]:
+    """
+    Run func inside a worker as a continuation of a remote trace.
+
+    Returns (result, spans). If func raises, the recorded spans are
+    attached to the exception as `trace_spans` so they survive pickling.
+    """
+    trace_id, parent_span_id = parent
+    trace = _Trace(trace_id)
+    remote_parent = Span("remote", trace, None, span_id=parent_span_id)
+    token = _current_span.set(remote_parent)
+
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        e.trace_spans = trace.spans
+        raise
+    finally:
+        _current_span.reset(token)
+
+    return result, trace.spans
+
+
+def _export(trace: _Trace) -> None:
+    """Write one finished trace to the configured exporter."""
+    payload = {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.app_name}},
+                    {"key": "service.version", "value": {"stringValue": settings.app_version}},
+                ]
+            },
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": trace.spans,
+            }],
+        }]
+    }
+    line = json.dumps(payload, separators=(",", ":")) + "\n"
+
+    try:
+        with _export_lock:
+            if settings.tracing_exporter == "file":
+                with open(settings.tracing_file, "a") as f:
+                    f.write(line)
+            else:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+    except Exception as e:
+        # Tracing must never break a request
+        logger.error(f"Error exporting trace: {e}")
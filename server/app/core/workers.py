@@ -0,0 +1,380 @@
+"""
+Conversion Worker Pool
+
+Runs CPU-bound conversions in a pool of isolated worker processes.
+
+Senior Dev Tip: ReportLab, Pillow and python-docx are pure CPU work.
+Running them inline in an async endpoint blocks the event loop, so every
+other request waits. Handing them to worker processes keeps the API
+responsive, and because each worker is a separate process we can put
+hard limits on it: a wall-clock timeout, an address-space cap and
+Pillow's decompression bomb guard. A worker that breaks a limit is
+killed and replaced - the API process never notices.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Optional
+from app.core.config import settings
+from app.core.tracing import span, run_traced, add_remote_spans
+from app.core.profiling import profile_store, run_profiled
+from app.core.scheduler import FairScheduler, ANONYMOUS_CLIENT
+import asyncio
+import multiprocessing
+import threading
+import warnings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionTimeoutError(Exception):
+    """Raised when a conversion runs longer than the configured timeout."""
+
+
+class ConversionResourceError(Exception):
+    """Raised when a conversion exceeds a memory or image size limit."""
+
+
+class WorkerCrashedError(Exception):
+    """Raised when a worker process dies in the middle of a conversion."""
+
+
+def _apply_resource_limits(memory_limit_mb: int, max_image_pixels: int) -> None:
+    """Set process-wide limits inside a freshly started worker."""
+    if memory_limit_mb > 0:
+        try:
+            import resource
+
+            # Linux ignores RLIMIT_RSS, so the address space is the
+            # closest limit the kernel will actually enforce
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Could not set worker memory limit: {e}")
+
+    from PIL import Image
+
+    # Pillow only warns between 1x and 2x the limit; make that an error too
+    Image.MAX_IMAGE_PIXELS = max_image_pixels
+    warnings.simplefilter("error", Image.DecompressionBombWarning)
+
+
+def _is_resource_error(exc: BaseException) -> bool:
+    """Check an exception and everything it wraps for limit violations."""
+    from PIL import Image
+
+    while exc is not None:
+        if isinstance(exc, (MemoryError, Image.DecompressionBombError,
+                            Image.DecompressionBombWarning)):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _worker_main(conn: Connection, memory_limit_mb: int, max_image_pixels: int) -> None:
+    """
+    Entry point of a worker process.
+
+    Receives (func, args, kwargs) tuples and answers with
+    ("ok", result), ("error", exception) or ("limit", message).
+    """
+    _apply_resource_limits(memory_limit_mb, max_image_pixels)
+
+    from app.services.pdf.styles import warm_style_cache
+
+    warm_style_cache()
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if task is None:
+            break
+
+        func, args, kwargs = task
+        try:
+            reply = ("ok", func(*args, **kwargs))
+        except BaseException as e:
+            if _is_resource_error(e):
+                reply = ("limit", str(e) or "out of memory")
+            else:
+                reply = ("error", e)
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception - report it as a plain error
+            conn.send(("error", Exception(str(e))))
+
+        # A MemoryError can leave the heap in a bad state; let the pool
+        # replace this worker instead of reusing it
+        if reply[0] == "limit":
+            break
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    conn: Connection
+    tasks_done: int = 0
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of conversion worker processes.
+
+    Senior Dev Tip: Each busy worker is driven by one thread that blocks
+    on its pipe, so a stuck conversion ties up exactly one worker and
+    one thread - never the event loop.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        timeout: float,
+        memory_limit_mb: int,
+        max_image_pixels: int,
+        max_tasks_per_worker: int
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_image_pixels = max_image_pixels
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self.scheduler = FairScheduler(size)
+        self._threads = ThreadPoolExecutor(
+            max_workers=size,
+            thread_name_prefix="conversion"
+        )
+
+    def start(self) -> None:
+        """Start all workers up front so the first requests don't pay for it."""
+        with self._lock:
+            while len(self._idle) < self.size:
+                self._idle.append(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.memory_limit_mb, self.max_image_pixels),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process=process, conn=parent_conn)
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        """Stop a worker; kill it outright if it may be stuck."""
+        try:
+            if kill:
+                worker.process.kill()
+            else:
+                worker.conn.send(None)
+        except Exception:
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.conn.close()
+
+    def _take_worker(self) -> _Worker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._spawn()
+
+    def _return_worker(self, worker: _Worker) -> None:
+        with self._lock:
+            self._idle.append(worker)
+
+    def _execute(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """Run one task on an idle worker (called from a pool thread)."""
+        worker = self._take_worker()
+        healthy = False
+
+        try:
+            if not worker.process.is_alive():
+                self._retire(worker, kill=True)
+                worker = self._spawn()
+
+            worker.conn.send((func, args, kwargs))
+
+            if not worker.conn.poll(self.timeout):
+                logger.warning(
+                    f"Conversion exceeded {self.timeout}s, killing worker {worker.process.pid}"
+                )
+                raise ConversionTimeoutError(
+                    f"Conversion timed out after {self.timeout:g} seconds"
+                )
+
+            try:
+                status, payload = worker.conn.recv()
+            except EOFError:
+                # Process died without answering (segfault, OOM killer...)
+                logger.error(
+                    f"Worker {worker.process.pid} died with exit code {worker.process.exitcode}"
+                )
+                raise WorkerCrashedError("Conversion worker crashed")
+
+            if status == "limit":
+                raise ConversionResourceError(
+                    f"Conversion exceeded resource limits: {payload}"
+                )
+
+            healthy = True
+            worker.tasks_done += 1
+
+            if status == "error":
+                raise payload
+            return payload
+
+        finally:
+            if healthy and worker.tasks_done < self.max_tasks_per_worker:
+                self._return_worker(worker)
+            else:
+                # Recycle: kill if it misbehaved, otherwise let it exit
+                # cleanly, and put a fresh worker in its place
+                self._retire(worker, kill=not healthy)
+                self._return_worker(self._spawn())
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        client_id: str = ANONYMOUS_CLIENT,
+        input_size: int = 0,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Queue a task for the pool and wait for its result.
+
+        client_id and input_size decide its place in the queue (see
+        FairScheduler); everything else is passed to func.
+        """
+        loop = asyncio.get_running_loop()
+
+        with span("queue_wait", {"client.id": client_id}):
+            await self.scheduler.acquire(client_id, input_size)
+
+        with span("conversion", {"conversion.function": func.__name__}) as conversion_span:
+            # Continue the trace inside the worker so its sub-spans
+            # (decode/layout/write) end up in this request's trace
+            parent = conversion_span.context()
+            if parent is not None:
+                func, args, kwargs = run_traced, (parent, func, args, kwargs), {}
+
+            def job():
+                try:
+                    return self._execute(func, args, kwargs)
+                finally:
+                    # Release from the thread so a cancelled request can't
+                    # hand out a worker that is still busy
+                    loop.call_soon_threadsafe(self.scheduler.release, client_id)
+
+            try:
+                result = await loop.run_in_executor(self._threads, job)
+            except Exception as e:
+                add_remote_spans(getattr(e, "trace_spans", []))
+                raise
+
+            if parent is not None:
+                result, spans = result
+                add_remote_spans(spans)
+            return result
+
+    def shutdown(self) -> None:
+        """Stop all idle workers and the driver threads."""
+        self._threads.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            self._retire(worker)
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def get_pool() -> WorkerPool:
+    """Return the shared worker pool, creating it on first use."""
+    global _pool
+
+    if _pool is None:
+        _pool = WorkerPool(
+            size=settings.conversion_workers,
+            timeout=settings.conversion_timeout_seconds,
+            memory_limit_mb=settings.worker_memory_limit_mb,
+            max_image_pixels=settings.max_image_pixels,
+            max_tasks_per_worker=settings.worker_max_tasks
+        )
+        _pool.start()
+        logger.info(f"Started conversion pool with {settings.conversion_workers} workers")
+
+    return _pool
+
+
+async def run_conversion(
+    func: Callable[..., Any],
+    *args: Any,
+    conversion_type: Optional[str] = None,
+    client_id: str = ANONYMOUS_CLIENT,
+    input_size: int = 0,
+    **kwargs: Any
+) -> Any:
+    """
+    Run a conversion function in an isolated worker without blocking the event loop.
+
+    Args:
+        func: Module-level conversion function (must be picklable)
+        *args: Positional arguments for the function
+        conversion_type: Conversion type, used to group profiling stats
+        client_id: Client the conversion runs for (fair queuing)
+        input_size: Total input size in bytes (queue lane and cost)
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        Whatever the conversion function returns
+
+    Raises:
+        ConversionTimeoutError: If the conversion ran too long
+        ConversionResourceError: If the conversion hit a memory/pixel limit
+        WorkerCrashedError: If the worker process died
+    """
+    mode = profile_store.choose_mode() if conversion_type else None
+
+    if mode is None:
+        return await get_pool().run(
+            func,
+            *args,
+            client_id=client_id,
+            input_size=input_size,
+            **kwargs
+        )
+
+    result, profile = await get_pool().run(
+        run_profiled,
+        mode,
+        settings.profiling_interval_ms,
+        func,
+        args,
+        kwargs,
+        client_id=client_id,
+        input_size=input_size
+    )
+    profile_store.record(conversion_type, profile)
+    return result
+
+
+def shutdown_pool() -> None:
+    """Stop all worker processes (called on application shutdown)."""
+    global _pool
+
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
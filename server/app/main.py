@@ -4,6 +4,13 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from app.core.config import settings
 from app.api.v1.router import api_router
+from app.core.workers import get_pool, shutdown_pool
+from app.core.tracing import start_trace
+from app.services.pdf.libreoffice import start_libreoffice_pool, shutdown_libreoffice_pool
+from app.utils.file_utils import cleanup_old_files
+from app.utils.upload_sessions import cleanup_expired_sessions
+from app.services.pdf.text_to_pdf import CHECKPOINT_DIR
+import asyncio
 import logging
 
 # Configure logging
@@ -31,6 +38,23 @@ app.add_middleware(
 )
 
 
+# Request tracing - only installed when enabled so it costs nothing otherwise
+if settings.tracing_enabled:
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        root = start_trace(
+            f"{request.method} {request.url.path}",
+            {
+                "http.method": request.method,
+                "http.target": request.url.path,
+            }
+        )
+        with root:
+            response = await call_next(request)
+            root.set_attribute("http.status_code", response.status_code)
+            return response
+
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -57,6 +81,21 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+async def periodic_cleanup():
+    """
+    Delete expired files in the background.
+    
+    Senior Dev Tip: Disk cleanup is blocking I/O, so it runs in a thread
+    to keep the event loop free.
+    """
+    while True:
+        await asyncio.sleep(settings.cleanup_interval_minutes * 60)
+        await asyncio.to_thread(cleanup_old_files, settings.output_dir, settings.cleanup_after_minutes)
+        await asyncio.to_thread(cleanup_old_files, settings.upload_dir, settings.cleanup_after_minutes)
+        await asyncio.to_thread(cleanup_old_files, CHECKPOINT_DIR, settings.cleanup_after_minutes)
+        await asyncio.to_thread(cleanup_expired_sessions)
+
+
 # Startup Event
 @app.on_event("startup")
 async def startup_event():
@@ -72,13 +111,24 @@ async def startup_event():
     # logger.info(f" Upload directory: {settings.upload_dir}")
     # logger.info(f" Output directory: {settings.output_dir}")
     # logger.info(f"📏 Max file size: {settings.max_file_size / (1024*1024)}MB")
+    
+    # Start conversion workers before the first request arrives
+    get_pool()
+    
+    # LibreOffice takes a while to start; DOCX uses ReportLab until it's up
+    app.state.libreoffice_task = asyncio.create_task(start_libreoffice_pool())
+    
+    app.state.cleanup_task = asyncio.create_task(periodic_cleanup())
 
 
 # Shutdown Event
 @app.on_event("shutdown")
 async def shutdown_event():
-    pass
     # logger.info(" Shutting down gracefully...")
+    app.state.cleanup_task.cancel()
+    app.state.libreoffice_task.cancel()
+    await shutdown_libreoffice_pool()
+    shutdown_pool()
 
 
 # Include API Router
@@ -10,7 +10,7 @@ Senior Dev Tip: Pydantic schemas provide:
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from enum import Enum
 
 
@@ -24,10 +24,26 @@ class ConversionType(str, Enum):
     IMAGE_TO_PDF = "image_to_pdf"
     DOCX_TO_PDF = "docx_to_pdf"
     TEXT_TO_PDF = "text_to_pdf"
+    XLSX_TO_PDF = "xlsx_to_pdf"
+    PPTX_TO_PDF = "pptx_to_pdf"
     PDF_TO_IMAGE = "pdf_to_image"
+    PDF_MERGE = "pdf_merge"
+    PDF_SPLIT = "pdf_split"
+    PDF_EXTRACT_PAGES = "pdf_extract_pages"
     # Future conversions can be added here
 
 
+class DocxEngine(str, Enum):
+    """
+    Engine used for DOCX to PDF.
+    
+    LibreOffice gives the best fidelity but only runs when its pool is
+    enabled; otherwise the ReportLab engine is used either way.
+    """
+    LIBREOFFICE = "libreoffice"
+    REPORTLAB = "reportlab"
+
+
 class ConversionRequest(BaseModel):
     """
     Request schema for file conversion.
@@ -64,6 +80,10 @@ class ConversionResponse(BaseModel):
     output_filename: str = Field(..., description="Generated file name")
     download_url: str = Field(..., description="URL to download the file")
     file_size: int = Field(..., description="Output file size in bytes")
+    thumbnail_url: Optional[str] = Field(
+        None,
+        description="URL of a first-page preview (PNG), if one was created"
+    )
     
     class Config:
         json_schema_extra = {
@@ -72,11 +92,59 @@ class ConversionResponse(BaseModel):
                 "message": "Conversion completed successfully",
                 "output_filename": "photo.pdf",
                 "download_url": "/api/v1/download/photo.pdf",
-                "file_size": 245678
+                "file_size": 245678,
+                "thumbnail_url": "/api/v1/convert/thumbnail/photo.pdf"
             }
         }
 
 
+class UploadCreateRequest(BaseModel):
+    """
+    Request schema for starting a resumable upload.
+    """
+    filename: str = Field(..., description="Original filename")
+    length: int = Field(..., gt=0, description="Total file size in bytes")
+    conversion_type: ConversionType = Field(
+        ...,
+        description="Conversion to run once the upload is complete"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filename": "report.docx",
+                "length": 15728640,
+                "conversion_type": "docx_to_pdf"
+            }
+        }
+
+
+class UploadSessionResponse(BaseModel):
+    """
+    State of a resumable upload session.
+    """
+    upload_id: str = Field(..., description="Upload session ID")
+    upload_url: str = Field(..., description="URL to PATCH chunks to")
+    offset: int = Field(..., description="Bytes received so far")
+    length: int = Field(..., description="Total file size in bytes")
+    conversion_type: ConversionType = Field(..., description="Conversion to run")
+    expires_at: float = Field(..., description="Unix time when the idle session is reclaimed")
+
+
+class UploadFinalizeRequest(BaseModel):
+    """
+    Options for converting a completed upload.
+    """
+    page_ranges: Optional[str] = Field(
+        None,
+        description="Page ranges for pdf_split / pdf_extract_pages, e.g. '1-3,5'"
+    )
+    engine: DocxEngine = Field(
+        default=DocxEngine.LIBREOFFICE,
+        description="Engine for docx_to_pdf (falls back to reportlab if LibreOffice is unavailable)"
+    )
+
+
 class ErrorResponse(BaseModel):
     """
     Error response schema.
@@ -98,3 +166,69 @@ class ErrorResponse(BaseModel):
                 "detail": "Only JPG, PNG files are supported for image_to_pdf"
             }
         }
+
+
+class ProfilingMode(str, Enum):
+    """Profiler used for sampled conversions."""
+    CPROFILE = "cprofile"
+    SAMPLING = "sampling"
+
+
+class ProfilingSettings(BaseModel):
+    """
+    Runtime profiling switch (admin only).
+    """
+    enabled: bool = Field(..., description="Profile sampled conversions")
+    sample_rate: float = Field(
+        default=0.05,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of conversions to profile"
+    )
+    mode: ProfilingMode = Field(
+        default=ProfilingMode.SAMPLING,
+        description="cprofile (exact, slower) or sampling (cheap stack samples)"
+    )
+
+
+class ProfilingStatus(ProfilingSettings):
+    """
+    Current profiling switch plus how many conversions were profiled.
+    """
+    profiled: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Profiled conversions per conversion type"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "enabled": True,
+                "sample_rate": 0.05,
+                "mode": "sampling",
+                "profiled": {"docx_to_pdf": 12, "image_to_pdf": 40}
+            }
+        }
+
+
+class ClientQueueMetrics(BaseModel):
+    """
+    Scheduler counters for one client.
+    """
+    queued: int = Field(..., description="Conversions waiting for a worker")
+    running: int = Field(..., description="Conversions currently running")
+    completed: int = Field(..., description="Conversions finished")
+    wait_seconds_total: float = Field(..., description="Total time spent queued")
+    wait_seconds_max: float = Field(..., description="Longest time a conversion was queued")
+    wait_seconds_avg: float = Field(..., description="Average time a conversion was queued")
+
+
+class SchedulerMetrics(BaseModel):
+    """
+    Worker pool and per-client queue metrics (admin only).
+    """
+    workers: int = Field(..., description="Worker slots in the pool")
+    clients: Dict[str, ClientQueueMetrics] = Field(
+        default_factory=dict,
+        description="Queue metrics per client"
+    )
@@ -6,20 +6,119 @@ Converts Microsoft Word documents to PDF.
 Senior Dev Tip: DOCX conversion is complex because we need to preserve
 formatting. For production, consider using LibreOffice or similar tools.
 This is a simplified implementation for learning purposes.
+
+Hard page breaks and new-page section breaks start a new PDF page. Those
+are also the only places a large document is cut for parallel rendering,
+so rendering the parts separately gives the same pages as one pass.
+(Before parallel rendering, breaks were ignored and pages simply filled
+up, so documents with breaks now have more, shorter pages.)
+
+The document is parsed once: planning reduces it to (text, starts a new
+page) pairs, and each part is rendered from its share of those.
 """
 
 from docx import Document
+from docx.enum.section import WD_SECTION_START
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+from typing import List, Optional, Set, Tuple
+from app.services.pdf.styles import PAGE_MARGINS, get_stylesheet
+from app.services.pdf.thumbnails import save_text_thumbnail, wrap_paragraphs
+from app.services.pdf.pdf_operations import normalize_pdf
+from app.core.tracing import span
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def convert_docx_to_pdf(input_path: str, output_path: str) -> str:
+def _page_breaks(doc) -> Set[int]:
+    """
+    Indexes of the paragraphs that must start a new page.
+
+    A page break inside a paragraph is treated as coming after it.
+    """
+    sections = doc.sections
+    breaks = set()
+    section_index = 0
+
+    for index, paragraph in enumerate(doc.paragraphs):
+        if paragraph.paragraph_format.page_break_before:
+            breaks.add(index)
+        if paragraph._p.xpath('.//w:br[@w:type="page"]'):
+            breaks.add(index + 1)
+        if paragraph._p.xpath('./w:pPr/w:sectPr'):
+            # A section ends here; the next one says how it starts
+            section_index += 1
+            if (
+                section_index < len(sections)
+                and sections[section_index].start_type != WD_SECTION_START.CONTINUOUS
+            ):
+                breaks.add(index + 1)
+
+    return breaks
+
+
+def _paragraphs(doc) -> List[Tuple[str, bool]]:
+    """(text, starts a new page) for every paragraph of a document."""
+    breaks = _page_breaks(doc)
+    return [
+        (paragraph.text, index in breaks)
+        for index, paragraph in enumerate(doc.paragraphs)
+    ]
+
+
+def _paragraph_flowables(paragraphs: List[Tuple[str, bool]], last: bool) -> list:
+    """
+    Flowables for a run of paragraphs (see _paragraphs).
+
+    Args:
+        paragraphs: The paragraphs to render
+        last: Whether these paragraphs end the document
+    """
+    # Get default styles (shared, built once per process)
+    normal_style = get_stylesheet()['Normal']
+
+    story = []
+    new_page = False
+
+    # Process each paragraph in the DOCX
+    for text, starts_page in paragraphs:
+        new_page = new_page or starts_page
+        if text.strip():  # Skip empty paragraphs
+            if new_page and story:
+                # The break replaces the spacing, which could otherwise
+                # spill onto a page of its own
+                story[-1] = PageBreak()
+            new_page = False
+
+            # Create paragraph for PDF
+            story.append(Paragraph(text, normal_style))
+            story.append(Spacer(1, 0.2 * inch))  # Add spacing
+
+    # A part that stops before the end is followed by a page break
+    if not last and story:
+        story.pop()
+
+    return story
+
+
+def _build(story: list, output_path: str) -> None:
+    # Create PDF
+    pdf = SimpleDocTemplate(
+        output_path,
+        pagesize=letter,
+        # Fixed dates and IDs, so the same input gives the same bytes
+        invariant=True,
+        **PAGE_MARGINS
+    )
+
+    # Build PDF (layout and writing happen together inside build)
+    with span("layout"):
+        pdf.build(story)
+
+
+def convert_docx_to_pdf(input_path: str, output_path: str, thumbnail: bool = False) -> str:
     """
     Convert a DOCX file to PDF.
     
@@ -32,6 +131,7 @@ def convert_docx_to_pdf(input_path: str, output_path: str) -> str:
     Args:
         input_path: Path to input DOCX file
         output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
         
     Returns:
         Path to generated PDF file
@@ -41,35 +141,25 @@ def convert_docx_to_pdf(input_path: str, output_path: str) -> str:
     """
     try:
         # Read DOCX document
-        doc = Document(input_path)
-        
-        # Create PDF
-        pdf = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
+        with span("decode"):
+            paragraphs = _paragraphs(Document(input_path))
         
-        # Container for PDF elements
-        story = []
+        story = _paragraph_flowables(paragraphs, last=True)
+        _build(story, output_path)
         
-        # Get default styles
-        styles = getSampleStyleSheet()
-        normal_style = styles['Normal']
+        # Same bytes as the file would get when rendered in parts
+        with span("normalize"):
+            normalize_pdf(output_path)
         
-        # Process each paragraph in the DOCX
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():  # Skip empty paragraphs
-                # Create paragraph for PDF
-                p = Paragraph(paragraph.text, normal_style)
-                story.append(p)
-                story.append(Spacer(1, 0.2 * inch))  # Add spacing
-        
-        # Build PDF
-        pdf.build(story)
+        # Preview from the paragraph text we already have
+        if thumbnail:
+            with span("thumbnail"):
+                save_text_thumbnail(
+                    wrap_paragraphs(text for text, _ in paragraphs if text.strip()),
+                    output_path,
+                    letter,
+                    margin=PAGE_MARGINS['topMargin']
+                )
         
         logger.info(f"Successfully converted DOCX to PDF: {output_path}")
         return output_path
@@ -77,3 +167,103 @@ def convert_docx_to_pdf(input_path: str, output_path: str) -> str:
     except Exception as e:
         logger.error(f"Error converting DOCX to PDF: {e}")
         raise Exception(f"DOCX to PDF conversion failed: {str(e)}")
+
+
+def plan_docx_chunks(
+    input_path: str,
+    max_chunks: int,
+    chunk_bytes: int
+) -> Optional[List[Tuple[List[Tuple[str, bool]], bool]]]:
+    """
+    Split a large DOCX file into runs of paragraphs that can be rendered in parallel.
+
+    Runs only start where the document starts a new page anyway. They carry
+    the paragraph text, so the parts don't have to parse the file again.
+
+    Args:
+        input_path: Path to input DOCX file
+        max_chunks: Most runs to cut the document into
+        chunk_bytes: Least characters of text per run
+
+    Returns:
+        (paragraphs, last) per run, ready for render_docx_paragraphs, or
+        None if the document should be rendered in one piece
+
+    Raises:
+        Exception: If planning fails
+    """
+    try:
+        with span("decode"):
+            paragraphs = _paragraphs(Document(input_path))
+
+        sizes = [len(text) for text, _ in paragraphs]
+        total = sum(sizes)
+
+        chunks = min(max_chunks, total // chunk_bytes)
+        if chunks < 2:
+            return None
+
+        # Cut at the first page break after each equal share of the text
+        cuts = [0]
+        done = 0
+        for index, size in enumerate(sizes):
+            if (
+                paragraphs[index][1]
+                and len(cuts) < chunks
+                and total * len(cuts) // chunks <= done < total
+            ):
+                cuts.append(index)
+            done += size
+
+        if len(cuts) < 2:
+            return None
+
+        ends = cuts[1:] + [len(paragraphs)]
+        return [
+            (paragraphs[start:end], end == len(paragraphs))
+            for start, end in zip(cuts, ends)
+        ]
+
+    except Exception as e:
+        logger.error(f"Error planning DOCX to PDF: {e}")
+        raise Exception(f"DOCX to PDF conversion failed: {str(e)}")
+
+
+def render_docx_paragraphs(
+    paragraphs: List[Tuple[str, bool]],
+    output_path: str,
+    last: bool,
+    thumbnail: bool = False
+) -> str:
+    """
+    Render one run of paragraphs planned by plan_docx_chunks.
+
+    Args:
+        paragraphs: (text, starts a new page) per paragraph
+        output_path: Path where this run's PDF should be saved
+        last: Whether the run ends the document
+        thumbnail: Also save a preview thumbnail next to the output
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If conversion fails
+    """
+    try:
+        _build(_paragraph_flowables(paragraphs, last), output_path)
+
+        if thumbnail:
+            with span("thumbnail"):
+                save_text_thumbnail(
+                    wrap_paragraphs(text for text, _ in paragraphs if text.strip()),
+                    output_path,
+                    letter,
+                    margin=PAGE_MARGINS['topMargin']
+                )
+
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error converting DOCX paragraphs to PDF: {e}")
+        raise Exception(f"DOCX to PDF conversion failed: {str(e)}")
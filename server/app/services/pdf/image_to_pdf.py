@@ -11,13 +11,52 @@ from PIL import Image
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.utils import ImageReader
+from app.core.tracing import span
+from app.services.pdf.thumbnails import save_image_thumbnail
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def convert_image_to_pdf(input_path: str, output_path: str) -> str:
+def _draw_page(img: Image.Image, input_path: str, output_path: str, passthrough: bool, thumbnail: bool) -> None:
+    """Draw the decoded image on a page sized to fit it and save the PDF."""
+    # Get image dimensions
+    img_width, img_height = img.size
+    
+    # Calculate PDF page size to fit image
+    # Senior Dev Tip: Maintain aspect ratio for better output
+    aspect_ratio = img_height / img_width
+    
+    # Use A4 size as base, adjust to fit image
+    page_width = 595  # A4 width in points
+    page_height = page_width * aspect_ratio
+    
+    with span("layout"):
+        # Create PDF
+        c = canvas.Canvas(output_path, pagesize=(page_width, page_height))
+        
+        # Draw image on PDF (fill entire page)
+        c.drawImage(
+            input_path if passthrough else ImageReader(img),
+            0, 0,
+            width=page_width,
+            height=page_height,
+            preserveAspectRatio=True
+        )
+    
+    # ReportLab has copied the pixels by now, so the in-memory image
+    # can be shrunk into the preview without decoding anything again
+    if thumbnail:
+        with span("thumbnail"):
+            save_image_thumbnail(img, output_path)
+    
+    # Save PDF
+    with span("write"):
+        c.save()
+
+
+def convert_image_to_pdf(input_path: str, output_path: str, thumbnail: bool = False) -> str:
     """
     Convert an image file to PDF.
     
@@ -27,6 +66,7 @@ def convert_image_to_pdf(input_path: str, output_path: str) -> str:
     Args:
         input_path: Path to input image file
         output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
         
     Returns:
         Path to generated PDF file
@@ -35,43 +75,30 @@ def convert_image_to_pdf(input_path: str, output_path: str) -> str:
         Exception: If conversion fails
     """
     try:
-        # Open the image
-        img = Image.open(input_path)
-        
-        # Convert RGBA to RGB if necessary (PDFs don't support transparency)
-        if img.mode == 'RGBA':
-            # Create white background
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[3])  # Use alpha channel as mask
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Get image dimensions
-        img_width, img_height = img.size
-        
-        # Calculate PDF page size to fit image
-        # Senior Dev Tip: Maintain aspect ratio for better output
-        aspect_ratio = img_height / img_width
-        
-        # Use A4 size as base, adjust to fit image
-        page_width = 595  # A4 width in points
-        page_height = page_width * aspect_ratio
-        
-        # Create PDF
-        c = canvas.Canvas(output_path, pagesize=(page_width, page_height))
-        
-        # Draw image on PDF (fill entire page)
-        c.drawImage(
-            input_path,
-            0, 0,
-            width=page_width,
-            height=page_height,
-            preserveAspectRatio=True
-        )
-        
-        # Save PDF
-        c.save()
+        # Close the file handle (and any converted copy) when done, rather
+        # than whenever the garbage collector gets to it
+        with Image.open(input_path) as source:
+            with span("decode"):
+                img = source
+                
+                # JPEGs can be embedded as-is (no re-encode); everything else
+                # is handed to ReportLab already decoded so it isn't decoded twice
+                passthrough = img.format == 'JPEG' and img.mode in ('RGB', 'L', 'CMYK')
+                
+                # Convert RGBA to RGB if necessary (PDFs don't support transparency)
+                if img.mode == 'RGBA':
+                    # Create white background
+                    background = Image.new('RGB', img.size, (255, 255, 255))
+                    background.paste(img, mask=img.split()[3])  # Use alpha channel as mask
+                    img = background
+                elif img.mode != 'RGB':
+                    img = img.convert('RGB')
+            
+            try:
+                _draw_page(img, input_path, output_path, passthrough, thumbnail)
+            finally:
+                if img is not source:
+                    img.close()
         
         logger.info(f"Successfully converted image to PDF: {output_path}")
         return output_path
@@ -0,0 +1,429 @@
+"""
+LibreOffice DOCX Engine
+
+High-fidelity DOCX to PDF conversion through a pool of warm, headless
+LibreOffice processes.
+
+Each pool member is a unoserver process (which owns one soffice instance
+with its own user profile) listening on a local port; documents are sent
+to it over XML-RPC. Members are health-checked before every conversion
+and replaced when they fail, time out or reach worker_max_tasks.
+
+Every daemon gets two ports the kernel reported free (one for XML-RPC,
+one for UNO), so several API processes (uvicorn --workers) never fight
+over them, and a daemon only joins the pool once its own process group
+is seen holding the XML-RPC port - a ping answered by some other
+process's daemon doesn't count.
+
+Senior Dev Tip: Starting soffice costs seconds, which is why the
+processes are started once and kept warm. The engine is optional: with
+libreoffice_pool_size = 0, while the pool is still starting, or when
+unoserver isn't installed, DOCX files go to the python-docx/ReportLab
+engine instead.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+from app.core.config import settings
+from app.core.scheduler import FairScheduler, ANONYMOUS_CLIENT
+from app.core.tracing import span
+from app.core.workers import ConversionTimeoutError
+from app.services.pdf.thumbnails import save_pdf_thumbnail
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import xmlrpc.client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Health checks must answer quickly; a busy-looking idle daemon is broken
+PING_TIMEOUT_SECONDS = 5
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    """XML-RPC transport with a socket timeout (the default has none)."""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+def _free_ports(count: int) -> List[int]:
+    """Ports that are free right now, picked by the kernel (bind to port 0)."""
+    sockets = []
+    try:
+        # Hold every socket until all are bound, so the ports differ
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sockets.append(sock)
+            sock.bind(("127.0.0.1", 0))
+        return [sock.getsockname()[1] for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+def _listening_inode(port: int) -> Optional[str]:
+    """Socket inode of the IPv4 listener on port, from /proc/net/tcp."""
+    with open("/proc/net/tcp") as f:
+        next(f)
+        for line in f:
+            fields = line.split()
+            # fields[1] is "ADDR:PORT" in hex, state 0A is LISTEN
+            if fields[3] == "0A" and int(fields[1].split(":")[1], 16) == port:
+                return fields[9]
+    return None
+
+
+def _group_owns_port(pgid: int, port: int) -> bool:
+    """
+    Whether a process in group pgid is the one listening on port.
+
+    Returns True where /proc isn't available (nothing to check against).
+    """
+    try:
+        inode = _listening_inode(port)
+    except OSError:
+        return True
+    if inode is None:
+        return False
+
+    target = f"socket:[{inode}]"
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            if os.getpgid(int(name)) != pgid:
+                continue
+            fd_dir = f"/proc/{name}/fd"
+            if any(os.readlink(os.path.join(fd_dir, fd)) == target for fd in os.listdir(fd_dir)):
+                return True
+        except OSError:
+            # Exited while we looked, or not ours to inspect
+            continue
+    return False
+
+
+def _memory_limiter(memory_limit_mb: int) -> Optional[Callable[[], None]]:
+    """preexec_fn that caps a daemon's address space (inherited by soffice)."""
+    if memory_limit_mb <= 0:
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    limit = memory_limit_mb * 1024 * 1024
+
+    def apply() -> None:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    return apply
+
+
+def _call(port: int, timeout: float, method: str, *args: Any) -> Any:
+    """Blocking XML-RPC call to the daemon on port (run in a thread)."""
+    proxy = xmlrpc.client.ServerProxy(
+        f"http://127.0.0.1:{port}",
+        transport=_TimeoutTransport(timeout),
+        allow_none=True
+    )
+    return getattr(proxy, method)(*args)
+
+
+@dataclass
+class _Daemon:
+    process: asyncio.subprocess.Process
+    port: int
+    profile_dir: str
+    tasks_done: int = 0
+
+
+class LibreOfficePool:
+    """
+    Fixed set of warm LibreOffice daemons, shared through a FairScheduler.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        command: str,
+        executable: Optional[str],
+        timeout: float,
+        start_timeout: float,
+        max_tasks_per_daemon: int,
+        memory_limit_mb: int = 0
+    ):
+        self.size = size
+        self.command = command
+        self.executable = executable
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.max_tasks_per_daemon = max_tasks_per_daemon
+        self.memory_limit_mb = memory_limit_mb
+
+        self.scheduler = FairScheduler(size)
+        self._idle: List[_Daemon] = []
+        self._replacing: set = set()
+        # Daemons that are up, idle or busy
+        self._members = 0
+
+    @property
+    def available(self) -> bool:
+        return self._members > 0
+
+    async def start(self) -> None:
+        """Start all daemons in parallel; members that fail are left out."""
+        daemons = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        self._idle.extend(daemon for daemon in daemons if daemon is not None)
+        self._members = len(self._idle)
+        logger.info(f"LibreOffice pool started with {self._members} of {self.size} daemons")
+
+    async def _spawn(self) -> Optional[_Daemon]:
+        """Start one daemon on fresh ports and wait until it answers, or give up."""
+        port, uno_port = _free_ports(2)
+        # Concurrent soffice instances must not share a user profile
+        profile_dir = tempfile.mkdtemp(prefix="libreoffice-profile-")
+        args = [
+            self.command,
+            "--interface", "127.0.0.1",
+            "--port", str(port),
+            "--uno-port", str(uno_port),
+            "--user-installation", Path(profile_dir).as_uri(),
+        ]
+        if self.executable:
+            args += ["--executable", self.executable]
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                # Own process group, so soffice dies with its unoserver
+                start_new_session=True,
+                preexec_fn=_memory_limiter(self.memory_limit_mb)
+            )
+        except OSError as e:
+            logger.warning(f"Could not start LibreOffice daemon ({self.command}): {e}")
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            return None
+
+        daemon = _Daemon(process=process, port=port, profile_dir=profile_dir)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.start_timeout
+
+        try:
+            while loop.time() < deadline and process.returncode is None:
+                if await self._ping(daemon):
+                    # Someone else may have grabbed the port in between
+                    if await asyncio.to_thread(_group_owns_port, process.pid, port):
+                        return daemon
+                    logger.warning(f"Port {port} answers, but not from our LibreOffice daemon")
+                    break
+                await asyncio.sleep(0.5)
+        except asyncio.CancelledError:
+            # Shutdown while starting - don't leave soffice behind
+            await self._retire(daemon)
+            raise
+
+        logger.warning(f"LibreOffice daemon on port {port} did not come up")
+        await self._retire(daemon)
+        return None
+
+    async def _ping(self, daemon: _Daemon) -> bool:
+        """Health check: the process is alive and answers over XML-RPC."""
+        if daemon.process.returncode is not None:
+            return False
+        try:
+            await asyncio.to_thread(_call, daemon.port, PING_TIMEOUT_SECONDS, "info")
+            return True
+        except Exception:
+            return False
+
+    async def _retire(self, daemon: _Daemon) -> None:
+        """Kill a daemon and its soffice, and remove its profile."""
+        if daemon.process.returncode is None:
+            try:
+                os.killpg(daemon.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError, AttributeError):
+                daemon.process.kill()
+            await daemon.process.wait()
+        shutil.rmtree(daemon.profile_dir, ignore_errors=True)
+
+    async def _replace(self, daemon: _Daemon) -> None:
+        """Recycle a daemon in the background and put its successor to work."""
+        await self._retire(daemon)
+        replacement = await self._spawn()
+        if replacement is not None:
+            self._members += 1
+            self._idle.append(replacement)
+
+    def _recycle(self, daemon: _Daemon) -> None:
+        self._members -= 1
+        task = asyncio.create_task(self._replace(daemon))
+        # Keep a reference so the task isn't garbage collected mid-way
+        self._replacing.add(task)
+        task.add_done_callback(self._replacing.discard)
+
+    async def convert(
+        self,
+        input_path: str,
+        output_path: str,
+        client_id: str = ANONYMOUS_CLIENT,
+        input_size: int = 0
+    ) -> bool:
+        """
+        Convert a document to PDF on the next free daemon.
+
+        Returns:
+            True if the PDF was written, False if the caller should use
+            the fallback engine (no healthy daemon, or LibreOffice failed)
+
+        Raises:
+            ConversionTimeoutError: If the conversion ran too long
+        """
+        if not self.available:
+            return False
+
+        with span("queue_wait", {"client.id": client_id}):
+            await self.scheduler.acquire(client_id, input_size)
+
+        try:
+            # Members being replaced leave their slot without a daemon
+            if not self._idle:
+                return False
+            daemon = self._idle.pop()
+
+            healthy = False
+            try:
+                if not await self._ping(daemon):
+                    logger.warning(f"LibreOffice daemon on port {daemon.port} failed its health check")
+                    return False
+
+                with span("conversion", {"conversion.engine": "libreoffice"}):
+                    await asyncio.to_thread(
+                        _call,
+                        daemon.port,
+                        self.timeout,
+                        "convert",
+                        os.path.abspath(input_path),
+                        None,
+                        os.path.abspath(output_path),
+                        "pdf"
+                    )
+                healthy = True
+                daemon.tasks_done += 1
+                return True
+
+            except TimeoutError:
+                logger.warning(f"LibreOffice conversion exceeded {self.timeout}s on port {daemon.port}")
+                raise ConversionTimeoutError(
+                    f"Conversion timed out after {self.timeout:g} seconds"
+                )
+
+            except xmlrpc.client.Fault as e:
+                # LibreOffice rejected the document; the daemon itself is fine
+                healthy = True
+                daemon.tasks_done += 1
+                logger.warning(f"LibreOffice could not convert {input_path}: {e.faultString}")
+                return False
+
+            except Exception as e:
+                logger.warning(f"LibreOffice daemon on port {daemon.port} failed: {e}")
+                return False
+
+            finally:
+                if healthy and daemon.tasks_done < self.max_tasks_per_daemon:
+                    self._idle.append(daemon)
+                else:
+                    self._recycle(daemon)
+
+        finally:
+            self.scheduler.release(client_id)
+
+    async def shutdown(self) -> None:
+        """Stop all daemons."""
+        for task in list(self._replacing):
+            task.cancel()
+        idle, self._idle = self._idle, []
+        for daemon in idle:
+            await self._retire(daemon)
+
+
+_pool: Optional[LibreOfficePool] = None
+
+
+async def start_libreoffice_pool() -> None:
+    """Start the daemon pool if it is enabled in settings."""
+    global _pool
+
+    if settings.libreoffice_pool_size <= 0 or _pool is not None:
+        return
+
+    _pool = LibreOfficePool(
+        size=settings.libreoffice_pool_size,
+        command=settings.libreoffice_command,
+        executable=settings.libreoffice_executable,
+        timeout=settings.conversion_timeout_seconds,
+        start_timeout=settings.libreoffice_start_timeout_seconds,
+        max_tasks_per_daemon=settings.worker_max_tasks,
+        memory_limit_mb=settings.libreoffice_memory_limit_mb
+    )
+    await _pool.start()
+
+
+async def shutdown_libreoffice_pool() -> None:
+    global _pool
+
+    if _pool is not None:
+        await _pool.shutdown()
+        _pool = None
+
+
+async def convert_docx_with_libreoffice(
+    input_path: str,
+    output_path: str,
+    thumbnail: bool = False,
+    client_id: str = ANONYMOUS_CLIENT,
+    input_size: int = 0
+) -> bool:
+    """
+    Convert a DOCX file with LibreOffice, if the pool can take it.
+
+    Args:
+        input_path: Path to input DOCX file
+        output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
+        client_id: Client the conversion runs for (fair queuing)
+        input_size: Input size in bytes (queue lane and cost)
+
+    Returns:
+        True if converted, False if the python-docx/ReportLab engine
+        should be used instead
+
+    Raises:
+        ConversionTimeoutError: If the conversion ran too long
+    """
+    if _pool is None:
+        return False
+
+    if not await _pool.convert(input_path, output_path, client_id, input_size):
+        return False
+
+    # LibreOffice only hands back the PDF, so rasterise its first page
+    if thumbnail:
+        with span("thumbnail"):
+            await asyncio.to_thread(save_pdf_thumbnail, output_path, output_path)
+
+    logger.info(f"Successfully converted DOCX to PDF with LibreOffice: {output_path}")
+    return True
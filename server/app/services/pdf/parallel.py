@@ -0,0 +1,206 @@
+"""
+Parallel Rendering
+
+Renders one very large text or DOCX file on several workers at once.
+
+The file is cut where a new page starts anyway (see plan_text_chunks and
+plan_docx_chunks), every part is laid out on its own worker, and the
+parts are stitched back together in page order.
+
+Senior Dev Tip: The pool runs one conversion per worker process, so a
+100MB log would otherwise keep one core busy while the others idle.
+Parts are ordinary pool jobs - they go through the same fair queue,
+timeout and memory limit as any other conversion. Everything is rendered
+in ReportLab's invariant mode, and single-pass renders are written
+through the same pypdf writer as stitched ones (normalize_pdf), so a
+file comes out as the same bytes whether or not it was split.
+"""
+
+from typing import Any, Callable, List, Optional
+from app.core.config import settings
+from app.core.scheduler import ANONYMOUS_CLIENT
+from app.core.tracing import span
+from app.core.workers import run_conversion
+from app.services.pdf.text_to_pdf import plan_text_chunks, render_text_range, save_text_checkpoint
+from app.services.pdf.docx_to_pdf import plan_docx_chunks, render_docx_paragraphs
+from app.services.pdf.pdf_operations import stitch_pdfs
+from app.utils.file_utils import get_thumbnail_path, delete_output_file
+import asyncio
+import os
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _render_parts(
+    render: Callable[..., Any],
+    output_path: str,
+    parts: List[tuple],
+    thumbnail: bool,
+    conversion_type: Optional[str],
+    client_id: str,
+    input_size: int
+) -> None:
+    """
+    Render every part on the pool, then stitch them into output_path.
+
+    Part (source, *rest) is rendered as render(source, part_path, *rest).
+    """
+    part_paths = []
+    for _ in parts:
+        fd, part_path = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix=".part.pdf")
+        os.close(fd)
+        part_paths.append(part_path)
+
+    try:
+        with span("parallel", {"render.parts": len(parts)}):
+            results = await asyncio.gather(
+                *(
+                    run_conversion(
+                        render,
+                        source,
+                        part_path,
+                        *rest,
+                        # The first part holds page 1
+                        thumbnail=thumbnail and index == 0,
+                        conversion_type=conversion_type,
+                        client_id=client_id,
+                        input_size=input_size // len(parts)
+                    )
+                    for index, (part_path, (source, *rest)) in enumerate(zip(part_paths, parts))
+                ),
+                # Let every part finish before the parts are cleaned up
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+            await run_conversion(
+                stitch_pdfs,
+                part_paths,
+                output_path,
+                client_id=client_id,
+                input_size=input_size // len(parts)
+            )
+
+        part_thumbnail = get_thumbnail_path(part_paths[0])
+        if thumbnail and os.path.exists(part_thumbnail):
+            os.replace(part_thumbnail, get_thumbnail_path(output_path))
+
+    finally:
+        for part_path in part_paths:
+            delete_output_file(part_path)
+
+
+async def convert_text_in_parallel(
+    input_path: str,
+    output_path: str,
+    thumbnail: bool = False,
+    incremental: bool = False,
+    conversion_type: Optional[str] = None,
+    client_id: str = ANONYMOUS_CLIENT,
+    input_size: int = 0
+) -> bool:
+    """
+    Convert a large text file to PDF in parts, if it is large enough.
+
+    Args:
+        input_path: Path to input text file
+        output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
+        incremental: Leave a checkpoint for incremental re-renders (and
+            let the incremental renderer handle files it can append to)
+        conversion_type: Conversion type, used to group profiling stats
+        client_id: Client the conversion runs for (fair queuing)
+        input_size: Input size in bytes (queue lane and cost)
+
+    Returns:
+        True if converted, False if the file should be converted in one piece
+    """
+    chunk_bytes = settings.parallel_render_chunk_bytes
+    if not settings.parallel_render_enabled or input_size < 2 * chunk_bytes:
+        return False
+
+    plan = await run_conversion(
+        plan_text_chunks,
+        input_path,
+        output_path,
+        settings.conversion_workers,
+        chunk_bytes,
+        incremental=incremental,
+        owner=client_id,
+        client_id=client_id,
+        input_size=input_size
+    )
+    if plan is None:
+        return False
+
+    await _render_parts(
+        render_text_range,
+        output_path,
+        [(input_path, start, end, plan["encoding"]) for start, end in plan["ranges"]],
+        thumbnail,
+        conversion_type,
+        client_id,
+        input_size
+    )
+
+    if incremental:
+        await asyncio.to_thread(save_text_checkpoint, input_path, output_path, plan, client_id)
+
+    logger.info(
+        f"Successfully converted text to PDF in {len(plan['ranges'])} parts: {output_path}"
+    )
+    return True
+
+
+async def convert_docx_in_parallel(
+    input_path: str,
+    output_path: str,
+    thumbnail: bool = False,
+    conversion_type: Optional[str] = None,
+    client_id: str = ANONYMOUS_CLIENT,
+    input_size: int = 0
+) -> bool:
+    """
+    Convert a large DOCX file to PDF in parts, if it has enough text and page breaks.
+
+    Args:
+        input_path: Path to input DOCX file
+        output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
+        conversion_type: Conversion type, used to group profiling stats
+        client_id: Client the conversion runs for (fair queuing)
+        input_size: Input size in bytes (queue lane and cost)
+
+    Returns:
+        True if converted, False if the file should be converted in one piece
+    """
+    if not settings.parallel_render_enabled or input_size < settings.parallel_render_min_docx_bytes:
+        return False
+
+    parts = await run_conversion(
+        plan_docx_chunks,
+        input_path,
+        settings.conversion_workers,
+        settings.parallel_render_chunk_bytes,
+        client_id=client_id,
+        input_size=input_size
+    )
+    if not parts:
+        return False
+
+    await _render_parts(
+        render_docx_paragraphs,
+        output_path,
+        parts,
+        thumbnail,
+        conversion_type,
+        client_id,
+        input_size
+    )
+
+    logger.info(f"Successfully converted DOCX to PDF in {len(parts)} parts: {output_path}")
+    return True
@@ -0,0 +1,341 @@
+"""
+PDF Page Operations Service
+
+Merges, splits and extracts pages from existing PDF files.
+
+Senior Dev Tip: PdfReader only parses the cross-reference table when it
+is opened; page objects are resolved on demand. By touching pages one
+index at a time and dropping each reader as soon as its pages have been
+copied, we never hold more than one source document in memory.
+"""
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import IndirectObject, NameObject, StreamObject
+from typing import Any, Dict, Iterable, List, Tuple
+from app.services.pdf.thumbnails import save_pdf_thumbnail
+from app.core.tracing import span
+import hashlib
+import tempfile
+import zipfile
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PageRangeError(ValueError):
+    """Raised when a requested page range is malformed or out of bounds."""
+
+
+def parse_page_ranges(spec: str, page_count: int) -> List[Tuple[int, int]]:
+    """
+    Parse a page range string like "1-3,5,8-" into zero-based ranges.
+
+    Args:
+        spec: Comma-separated 1-based pages or ranges ("2", "4-6", "7-")
+        page_count: Number of pages in the document
+
+    Returns:
+        List of (start, stop) tuples, zero-based and stop-exclusive
+
+    Raises:
+        PageRangeError: If the spec is malformed or out of bounds
+    """
+    if not spec or not spec.strip():
+        raise PageRangeError("Page ranges are required")
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        try:
+            if "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start = int(start_str) if start_str.strip() else 1
+                end = int(end_str) if end_str.strip() else page_count
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise PageRangeError(f"Invalid page range '{part}'")
+
+        if start < 1 or end > page_count or start > end:
+            raise PageRangeError(
+                f"Invalid page range '{part}' for a document with {page_count} pages"
+            )
+
+        ranges.append((start - 1, end))
+
+    if not ranges:
+        raise PageRangeError("Page ranges are required")
+
+    return ranges
+
+
+def _copy_pages(reader: PdfReader, writer: PdfWriter, start: int, stop: int) -> None:
+    """Copy pages [start, stop) one at a time so only touched pages are parsed."""
+    for index in range(start, stop):
+        writer.add_page(reader.pages[index])
+
+
+def merge_pdfs(input_paths: List[str], output_path: str, thumbnail: bool = False) -> str:
+    """
+    Merge several PDF files into one, in the given order.
+
+    Args:
+        input_paths: Paths to input PDF files
+        output_path: Path where merged PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If merging fails
+    """
+    try:
+        writer = PdfWriter()
+
+        with span("decode", {"pdf.inputs": len(input_paths)}):
+            for input_path in input_paths:
+                # add_page clones the page into the writer, so the source
+                # file can be closed before the next one is opened
+                with open(input_path, 'rb') as f:
+                    reader = PdfReader(f)
+                    _copy_pages(reader, writer, 0, len(reader.pages))
+                    del reader
+
+        with span("write"):
+            with open(output_path, 'wb') as f:
+                writer.write(f)
+            writer.close()
+
+        # No decoded content to reuse here, so rasterise the result
+        if thumbnail:
+            with span("thumbnail"):
+                save_pdf_thumbnail(output_path, output_path)
+
+        logger.info(f"Successfully merged {len(input_paths)} PDFs: {output_path}")
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error merging PDFs: {e}")
+        raise Exception(f"PDF merge failed: {str(e)}")
+
+
+def _resources_key(obj: Any) -> Any:
+    """Hashable value that is equal for structurally equal PDF objects."""
+    if isinstance(obj, IndirectObject):
+        obj = obj.get_object()
+    if isinstance(obj, StreamObject):
+        return ("stream", _resources_key(dict(obj)), hashlib.sha256(obj.get_data()).hexdigest())
+    if isinstance(obj, dict):
+        return tuple(sorted((key, _resources_key(value)) for key, value in obj.items()))
+    if isinstance(obj, list):
+        return tuple(_resources_key(value) for value in obj)
+    return repr(obj)
+
+
+def add_pages_sharing_resources(writer: PdfWriter, pages: Iterable[Any], shared: Dict[Any, Any]) -> None:
+    """
+    Add pages to writer; pages whose resources equal an earlier page's share one copy.
+
+    Args:
+        writer: Writer to add the pages to
+        pages: Pages of an open PdfReader
+        shared: Resources already in writer, kept across calls
+    """
+    for page in pages:
+        if "/Resources" not in page:
+            writer.add_page(page)
+            continue
+
+        key = _resources_key(page["/Resources"])
+        if key in shared:
+            page[NameObject("/Resources")] = shared[key]
+        writer.add_page(page)
+        shared.setdefault(key, writer.pages[-1]["/Resources"])
+
+
+def stitch_pdfs(part_paths: List[str], output_path: str) -> str:
+    """
+    Join PDFs rendered in parts (see parallel.py) into one document.
+
+    Unlike merge_pdfs, pages whose resources (fonts, mostly) equal those
+    of an earlier page share one copy, so the result has the same objects
+    as a single-pass render instead of one font set per part.
+
+    Args:
+        part_paths: Paths to the parts, in page order
+        output_path: Path where the PDF should be saved
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If stitching fails
+    """
+    try:
+        writer = PdfWriter()
+        shared: Dict[Any, Any] = {}
+
+        with span("decode", {"pdf.inputs": len(part_paths)}):
+            for part_path in part_paths:
+                with open(part_path, 'rb') as f:
+                    reader = PdfReader(f)
+                    add_pages_sharing_resources(writer, reader.pages, shared)
+                    del reader
+
+        with span("write"):
+            with open(output_path, 'wb') as f:
+                writer.write(f)
+            writer.close()
+
+        logger.info(f"Stitched {len(part_paths)} parts into {output_path}")
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error stitching PDFs: {e}")
+        raise Exception(f"PDF stitching failed: {str(e)}")
+
+
+def normalize_pdf(path: str) -> None:
+    """
+    Rewrite a PDF rendered in one pass the way stitch_pdfs writes parts.
+
+    ReportLab and pypdf lay out the same objects differently, so without
+    this a document rendered in one piece and the same document stitched
+    from parts would have the same pages but not the same bytes.
+
+    Args:
+        path: PDF to rewrite in place
+
+    Raises:
+        Exception: If rewriting fails
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part.pdf")
+    os.close(fd)
+    try:
+        stitch_pdfs([path], tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def split_pdf(
+    input_path: str,
+    output_path: str,
+    page_ranges: str,
+    thumbnail: bool = False
+) -> str:
+    """
+    Split a PDF into one file per page range, packed into a ZIP archive.
+
+    Senior Dev Tip: Each part is written straight into the archive and
+    released before the next one is built, so peak memory is bounded by
+    the largest part rather than the whole document.
+
+    Args:
+        input_path: Path to input PDF file
+        output_path: Path where the ZIP archive should be saved
+        page_ranges: Page range spec, e.g. "1-3,4-10"
+        thumbnail: Also save a preview of the first part next to the output
+
+    Returns:
+        Path to generated ZIP file
+
+    Raises:
+        Exception: If splitting fails
+    """
+    try:
+        base_name = os.path.splitext(os.path.basename(input_path))[0]
+
+        with open(input_path, 'rb') as f:
+            reader = PdfReader(f)
+            ranges = parse_page_ranges(page_ranges, len(reader.pages))
+
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for start, stop in ranges:
+                    writer = PdfWriter()
+                    _copy_pages(reader, writer, start, stop)
+
+                    # PdfWriter needs a seekable stream, so each part goes
+                    # through a temp file before being deflated into the archive
+                    part_name = f"{base_name}_pages_{start + 1}-{stop}.pdf"
+                    with tempfile.TemporaryFile() as part:
+                        writer.write(part)
+                        writer.close()
+                        part.seek(0)
+                        with archive.open(part_name, 'w') as entry:
+                            while chunk := part.read(1024 * 1024):
+                                entry.write(chunk)
+
+        # The archive can't be previewed; use the first part's first page
+        if thumbnail:
+            with span("thumbnail"):
+                save_pdf_thumbnail(input_path, output_path, page=ranges[0][0] + 1)
+
+        logger.info(f"Successfully split PDF into {len(ranges)} parts: {output_path}")
+        return output_path
+
+    except PageRangeError:
+        # Bad page ranges are a client error, let the endpoint report them
+        raise
+
+    except Exception as e:
+        logger.error(f"Error splitting PDF: {e}")
+        raise Exception(f"PDF split failed: {str(e)}")
+
+
+def extract_pdf_pages(
+    input_path: str,
+    output_path: str,
+    page_ranges: str,
+    thumbnail: bool = False
+) -> str:
+    """
+    Extract selected pages of a PDF into a new PDF.
+
+    Args:
+        input_path: Path to input PDF file
+        output_path: Path where PDF should be saved
+        page_ranges: Page range spec, e.g. "2,5-7"
+        thumbnail: Also save a preview thumbnail next to the output
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If extraction fails
+    """
+    try:
+        with open(input_path, 'rb') as f:
+            reader = PdfReader(f)
+            ranges = parse_page_ranges(page_ranges, len(reader.pages))
+
+            with span("decode"):
+                writer = PdfWriter()
+                for start, stop in ranges:
+                    _copy_pages(reader, writer, start, stop)
+
+            with span("write"):
+                with open(output_path, 'wb') as out:
+                    writer.write(out)
+                writer.close()
+
+        if thumbnail:
+            with span("thumbnail"):
+                save_pdf_thumbnail(output_path, output_path)
+
+        logger.info(f"Successfully extracted pages from PDF: {output_path}")
+        return output_path
+
+    except PageRangeError:
+        # Bad page ranges are a client error, let the endpoint report them
+        raise
+
+    except Exception as e:
+        logger.error(f"Error extracting PDF pages: {e}")
+        raise Exception(f"PDF page extraction failed: {str(e)}")
@@ -0,0 +1,177 @@
+"""
+PPTX to PDF Conversion Service
+
+Converts PowerPoint presentations to PDF, one slide per page.
+
+Senior Dev Tip: Like DOCX, full-fidelity slide rendering needs a real
+office suite. This implementation places text, pictures and tables at
+their positions on the slide, which is enough for a readable handout.
+"""
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Frame, Paragraph, Table
+from PIL import Image, ImageDraw, ImageFont
+from app.services.pdf.styles import get_stylesheet, get_table_style
+from app.services.pdf.thumbnails import save_image_thumbnail
+from app.core.tracing import span
+from xml.sax.saxutils import escape
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+# PowerPoint measures everything in English Metric Units
+EMU_PER_POINT = 12700
+
+
+def _to_points(emu) -> float:
+    return (emu or 0) / EMU_PER_POINT
+
+
+def _text_paragraphs(shape):
+    """Turn a shape's text frame into Paragraph flowables."""
+    styles = get_stylesheet()
+    style = styles['Title'] if shape.is_placeholder and 'Title' in shape.name else styles['Normal']
+
+    paragraphs = []
+    for paragraph in shape.text_frame.paragraphs:
+        text = "".join(run.text for run in paragraph.runs)
+        if text.strip():
+            paragraphs.append(Paragraph(escape(text), style))
+    return paragraphs
+
+
+def _draw_shape(c: canvas.Canvas, shape, page_height: float) -> None:
+    """Draw a single slide shape onto the current page."""
+    # Group shapes carry their own children
+    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+        for child in shape.shapes:
+            _draw_shape(c, child, page_height)
+        return
+
+    if shape.left is None or shape.top is None:
+        return
+
+    x = _to_points(shape.left)
+    width = _to_points(shape.width)
+    height = _to_points(shape.height)
+    # PDF origin is bottom-left, PowerPoint's is top-left
+    y = page_height - _to_points(shape.top) - height
+
+    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+        image = ImageReader(io.BytesIO(shape.image.blob))
+        c.drawImage(image, x, y, width=width, height=height, mask='auto')
+
+    elif getattr(shape, "has_table", False) and shape.has_table:
+        data = [
+            [cell.text for cell in row.cells]
+            for row in shape.table.rows
+        ]
+        table = Table(data)
+        table.setStyle(get_table_style())
+        Frame(x, y, width, height, showBoundary=0).addFromList([table], c)
+
+    elif shape.has_text_frame:
+        paragraphs = _text_paragraphs(shape)
+        if paragraphs:
+            Frame(x, y, width, height, showBoundary=0).addFromList(paragraphs, c)
+
+
+def _sketch_shape(page: Image.Image, draw: ImageDraw.ImageDraw, shape) -> None:
+    """Draw a rough version of a shape (pictures and text) for the preview."""
+    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+        for child in shape.shapes:
+            _sketch_shape(page, draw, child)
+        return
+
+    if shape.left is None or shape.top is None:
+        return
+
+    # One pixel per point, top-left origin like PowerPoint
+    box = (
+        int(_to_points(shape.left)),
+        int(_to_points(shape.top)),
+        max(int(_to_points(shape.width)), 1),
+        max(int(_to_points(shape.height)), 1)
+    )
+
+    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+        with Image.open(io.BytesIO(shape.image.blob)) as picture:
+            # draft() lets JPEGs decode at reduced size
+            picture.draft("RGB", box[2:])
+            page.paste(picture.convert("RGB").resize(box[2:]), box[:2])
+
+    elif shape.has_text_frame:
+        draw.multiline_text(
+            box[:2],
+            shape.text_frame.text,
+            fill="black",
+            font=ImageFont.load_default()
+        )
+
+
+def _save_slide_thumbnail(slide, page_width: float, page_height: float, output_path: str) -> None:
+    """Save a preview of the first slide."""
+    try:
+        page = Image.new("RGB", (int(page_width), int(page_height)), "white")
+        draw = ImageDraw.Draw(page)
+        for shape in slide.shapes:
+            _sketch_shape(page, draw, shape)
+        save_image_thumbnail(page, output_path)
+    except Exception as e:
+        logger.warning(f"Could not create thumbnail for {output_path}: {e}")
+
+
+def convert_pptx_to_pdf(input_path: str, output_path: str, thumbnail: bool = False) -> str:
+    """
+    Convert a PPTX presentation to PDF.
+
+    Args:
+        input_path: Path to input PPTX file
+        output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If conversion fails
+    """
+    try:
+        with span("decode"):
+            presentation = Presentation(input_path)
+
+        # Pages match the slide size
+        page_width = _to_points(presentation.slide_width)
+        page_height = _to_points(presentation.slide_height)
+
+        c = canvas.Canvas(output_path, pagesize=(page_width, page_height))
+
+        with span("layout"):
+            for slide in presentation.slides:
+                for shape in slide.shapes:
+                    _draw_shape(c, shape, page_height)
+                c.showPage()
+
+        with span("write"):
+            c.save()
+
+        # The presentation is already parsed; sketch slide 1 from it
+        if thumbnail and len(presentation.slides):
+            with span("thumbnail"):
+                _save_slide_thumbnail(
+                    presentation.slides[0],
+                    page_width,
+                    page_height,
+                    output_path
+                )
+
+        logger.info(f"Successfully converted PPTX to PDF: {output_path}")
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error converting PPTX to PDF: {e}")
+        raise Exception(f"PPTX to PDF conversion failed: {str(e)}")
@@ -0,0 +1,71 @@
+"""
+Shared PDF Styles
+
+Style context shared by all ReportLab based converters.
+
+Senior Dev Tip: getSampleStyleSheet() builds a brand new stylesheet on
+every call. Building styles once per process and reusing them keeps that
+work out of every single conversion. Treat the returned objects as
+read-only - they are shared between requests.
+"""
+
+from functools import lru_cache
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.platypus import TableStyle
+
+
+# Default page margins (in points) used by document-style conversions
+PAGE_MARGINS = {
+    "rightMargin": 72,
+    "leftMargin": 72,
+    "topMargin": 72,
+    "bottomMargin": 18,
+}
+
+
+@lru_cache(maxsize=None)
+def get_stylesheet() -> StyleSheet1:
+    """Return the process-wide sample stylesheet."""
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def get_code_style() -> ParagraphStyle:
+    """
+    Return the monospace style used for plain text.
+
+    Senior Dev Tip: Monospace fonts preserve formatting for code
+    """
+    return ParagraphStyle(
+        'Code',
+        parent=get_stylesheet()['Normal'],
+        fontName='Courier',
+        fontSize=10,
+        leading=12,
+        leftIndent=0,
+        rightIndent=0,
+        alignment=TA_LEFT
+    )
+
+
+@lru_cache(maxsize=None)
+def get_table_style() -> TableStyle:
+    """Return the grid style used for tabular data (spreadsheets, slide tables)."""
+    return TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('LEADING', (0, 0), (-1, -1), 8),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+
+
+def warm_style_cache() -> None:
+    """Build all cached styles up front (called when a worker starts)."""
+    get_stylesheet()
+    get_code_style()
+    get_table_style()
@@ -5,94 +5,591 @@ Converts plain text files to PDF.
 
 Senior Dev Tip: This is one of the simpler conversions, but we still
 need to handle encoding, line wrapping, and formatting properly.
+
+Incremental mode (for growing log files): every render leaves a layout
+checkpoint in CHECKPOINT_DIR - where the last page starts in the input,
+how many pages come before it, and a hash of everything before that
+point. Checkpoints are keyed by the client and the first bytes of the
+input, so only the same client's earlier render is ever reused. When a
+later upload starts with the same bytes, only the last page and the new
+tail are laid out; the finished pages are copied into a fresh PDF
+without being laid out again.
+
+Parallel mode (for very large files): page breaks are predicted without
+rendering - every line is one fixed-height flowable, so where a page
+ends is simple arithmetic - and the file is cut into line ranges that
+start exactly at a page. Each range is then rendered on its own worker.
 """
 
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
+from reportlab.platypus import SimpleDocTemplate, Spacer, Preformatted
+from pypdf import PdfReader, PdfWriter
+from typing import Iterable, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.core.scheduler import ANONYMOUS_CLIENT
+from app.services.pdf.styles import PAGE_MARGINS, get_code_style
+from app.services.pdf.thumbnails import save_text_thumbnail
+from app.services.pdf.pdf_operations import add_pages_sharing_resources, normalize_pdf
+from app.core.tracing import span
+from bisect import bisect_left
+import hashlib
+import json
+import os
+import re
+import tempfile
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Text mode splits lines on any of these (universal newlines)
+_NEWLINE_RE = re.compile(rb"\r\n|\r|\n")
+
+# Checkpoints are looked up by a hash of the first HEAD_BYTES of the input,
+# so smaller files are always rendered from scratch (they're cheap anyway)
+HEAD_BYTES = 4096
+
+# Not in output_dir: outputs are downloadable by name, checkpoints aren't.
+# Swept by the periodic cleanup like the uploads themselves.
+CHECKPOINT_DIR = os.path.join(settings.upload_dir, "checkpoints")
+
+CHECKPOINT_VERSION = 1
+
+_HASH_CHUNK = 1024 * 1024
+
+# SimpleDocTemplate's frame keeps Frame's default padding on every side
+_FRAME_PADDING = 6
+
+# Frame accepts a flowable that overshoots the bottom by this much
+# (float rounding), so the prediction has to as well
+_FIT_TOLERANCE = 1e-6
+
+os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+
+
+class _TrackingDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that remembers which input line starts each page."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_starts: List[int] = []
+
+    def afterFlowable(self, flowable) -> None:
+        # ReportLab's own action flowables carry no offset
+        offset = getattr(flowable, "byte_offset", None)
+        if offset is not None and len(self.page_starts) < self.page:
+            self.page_starts.append(offset)
+
+
+def _detect_encoding(data: bytes) -> str:
+    """UTF-8 if the bytes are valid UTF-8, latin-1 (never fails) otherwise."""
+    try:
+        data.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
 
-def convert_text_to_pdf(input_path: str, output_path: str) -> str:
+def _read_lines(data: bytes, encoding: str, base_offset: int = 0) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (byte offset, line) pairs.
+
+    Matches open(..., 'r').read().split('\\n'), but keeps track of where
+    every line starts in the file.
+    """
+    start = 0
+    for match in _NEWLINE_RE.finditer(data):
+        yield base_offset + start, data[start:match.start()].decode(encoding)
+        start = match.end()
+    yield base_offset + start, data[start:].decode(encoding)
+
+
+def _line_flowable(line: str):
+    # Use Preformatted to preserve spacing
+    if line.strip():
+        return Preformatted(line, get_code_style())
+    # Add spacing for empty lines
+    return Spacer(1, 0.1 * inch)
+
+
+def _line_flowables(lines: Iterator[Tuple[int, str]]) -> list:
+    """One flowable per line, tagged with the line's byte offset."""
+    story = []
+    for offset, line in lines:
+        flowable = _line_flowable(line)
+        flowable.byte_offset = offset
+        story.append(flowable)
+    return story
+
+
+def _render(story: list, output_path: str) -> List[int]:
+    """Lay out a story; returns the byte offset that starts each page."""
+    pdf = _TrackingDocTemplate(
+        output_path,
+        pagesize=letter,
+        # Fixed dates and IDs, so the same input gives the same bytes
+        invariant=True,
+        **PAGE_MARGINS
+    )
+    pdf.build(story)
+    return pdf.page_starts
+
+
+def _predict_page_starts(lines: Iterable[Tuple[int, str]]) -> List[int]:
+    """
+    Byte offset that starts each page, without rendering anything.
+
+    Follows the same rule as ReportLab's Frame: a line goes to the next
+    page when its height would take the cursor below the bottom of the
+    frame. The frame is the page minus the margins and the padding.
+    """
+    width, height = letter
+    top = height - PAGE_MARGINS['topMargin'] - _FRAME_PADDING
+    bottom = PAGE_MARGINS['bottomMargin'] + _FRAME_PADDING
+    available_width = (
+        width - PAGE_MARGINS['leftMargin'] - PAGE_MARGINS['rightMargin'] - 2 * _FRAME_PADDING
+    )
+    text_height = _line_flowable("x").wrap(available_width, top - bottom)[1]
+    blank_height = _line_flowable("").wrap(available_width, top - bottom)[1]
+
+    page_starts = []
+    y = bottom
+    for offset, line in lines:
+        line_height = text_height if line.strip() else blank_height
+        if y - line_height < bottom - _FIT_TOLERANCE:
+            page_starts.append(offset)
+            y = top
+        y -= line_height
+    return page_starts
+
+
+def _checkpoint_path(owner: str, head: bytes) -> str:
+    key = hashlib.sha256(owner.encode() + b"\0" + head).hexdigest()
+    return os.path.join(CHECKPOINT_DIR, f"{key}.checkpoint.json")
+
+
+def _save_checkpoint(
+    output_path: str,
+    owner: str,
+    head: bytes,
+    encoding: str,
+    pages: int,
+    last_page_offset: int,
+    prefix_sha256: str
+) -> None:
+    """
+    Record where the last page of output_path starts.
+
+    Args:
+        output_path: The rendered PDF
+        owner: Client the PDF was rendered for (lookup key)
+        head: First HEAD_BYTES of the input (lookup key)
+        encoding: Encoding the input was decoded with
+        pages: Number of pages in output_path
+        last_page_offset: Byte offset of the first line of the last page
+        prefix_sha256: sha256 hex digest of the input up to that offset
+    """
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "output_filename": os.path.basename(output_path),
+        "encoding": encoding,
+        "pages": pages,
+        "last_page_offset": last_page_offset,
+        "prefix_sha256": prefix_sha256,
+    }
+
+    # Written atomically: concurrent refreshes of the same log may race
+    path = _checkpoint_path(owner, head)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(
+    f,
+    output_dir: str,
+    owner: str,
+    head: bytes,
+    size: int
+) -> Optional[Tuple[dict, object]]:
+    """
+    Find a usable checkpoint of owner's for the open input file f.
+
+    Returns:
+        (checkpoint, sha256 of the input up to the checkpoint's last page),
+        or None if the input doesn't continue a previous render
+    """
+    try:
+        with open(_checkpoint_path(owner, head)) as cf:
+            checkpoint = json.load(cf)
+    except (OSError, ValueError):
+        return None
+
+    offset = checkpoint.get("last_page_offset", 0)
+    previous_pdf = os.path.join(output_dir, checkpoint.get("output_filename", ""))
+    if (
+        checkpoint.get("version") != CHECKPOINT_VERSION
+        or not 0 < offset <= size
+        or not os.path.isfile(previous_pdf)
+    ):
+        return None
+
+    # Everything before the last page must be byte-for-byte the same
+    prefix_hash = hashlib.sha256()
+    f.seek(0)
+    remaining = offset
+    while remaining:
+        chunk = f.read(min(_HASH_CHUNK, remaining))
+        if not chunk:
+            return None
+        prefix_hash.update(chunk)
+        remaining -= len(chunk)
+
+    if prefix_hash.hexdigest() != checkpoint["prefix_sha256"]:
+        return None
+    return checkpoint, prefix_hash
+
+
+def _append_to_previous(
+    checkpoint: dict,
+    prefix_hash,
+    tail: bytes,
+    output_path: str,
+    owner: str,
+    head: bytes
+) -> bool:
+    """
+    Build output_path from the previous PDF plus a render of the tail.
+
+    The previous last page is dropped and laid out again together with the
+    new lines, because new text may still fit on it. The kept pages are
+    copied into a new file, so nothing of the dropped page survives and the
+    file doesn't grow with every refresh.
+
+    Returns:
+        False if the previous output can't be reused (caller renders fully)
+    """
+    output_dir = os.path.dirname(output_path)
+    previous_pdf = os.path.join(output_dir, checkpoint["output_filename"])
+    encoding = checkpoint["encoding"]
+
+    try:
+        tail.decode(encoding)
+    except UnicodeDecodeError:
+        # A full render would pick another encoding for the whole file
+        return False
+
+    offset = checkpoint["last_page_offset"]
+    kept_pages = checkpoint["pages"] - 1
+
+    writer = PdfWriter()
+    # The tail uses the same fonts, so its pages share the kept pages' copy
+    shared: dict = {}
+
+    with open(previous_pdf, 'rb') as f:
+        reader = PdfReader(f)
+        if len(reader.pages) != checkpoint["pages"]:
+            return False
+        with span("decode", {"text.kept_pages": kept_pages}):
+            add_pages_sharing_resources(
+                writer,
+                (reader.pages[index] for index in range(kept_pages)),
+                shared
+            )
+        del reader
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", dir=output_dir, delete=False) as tmp:
+        tail_pdf = tmp.name
+    try:
+        with span("layout", {"text.tail_bytes": len(tail)}):
+            page_starts = _render(
+                _line_flowables(_read_lines(tail, encoding, offset)),
+                tail_pdf
+            )
+
+        with span("write"):
+            with open(tail_pdf, 'rb') as f:
+                add_pages_sharing_resources(writer, PdfReader(f).pages, shared)
+            with open(output_path, 'wb') as f:
+                writer.write(f)
+            writer.close()
+    finally:
+        os.remove(tail_pdf)
+
+    prefix_hash.update(tail[:page_starts[-1] - offset])
+    _save_checkpoint(
+        output_path,
+        owner,
+        head,
+        encoding,
+        kept_pages + len(page_starts),
+        page_starts[-1],
+        prefix_hash.hexdigest()
+    )
+    logger.info(
+        f"Appended {len(tail)} bytes to {kept_pages} existing pages: {output_path}"
+    )
+    return True
+
+
+def convert_text_to_pdf(
+    input_path: str,
+    output_path: str,
+    thumbnail: bool = False,
+    incremental: bool = False,
+    owner: str = ANONYMOUS_CLIENT
+) -> str:
     """
     Convert a text file to PDF.
-    
+
     Senior Dev Tip: Handle different text encodings gracefully.
     UTF-8 is standard, but users might upload files in other encodings.
-    
+
     Args:
         input_path: Path to input text file
         output_path: Path where PDF should be saved
-        
+        thumbnail: Also save a preview thumbnail next to the output
+        incremental: Reuse the pages of an earlier render of the same
+            (now longer) file, and leave a checkpoint for the next one
+        owner: Client the conversion runs for; only its own earlier
+            renders are reused
+
     Returns:
         Path to generated PDF file
-        
+
     Raises:
         Exception: If conversion fails
     """
     try:
-        # Read text file with encoding detection
-        # Senior Dev Tip: Try UTF-8 first, fall back to other encodings
-        try:
-            with open(input_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
-        except UnicodeDecodeError:
-            # Try with latin-1 as fallback
-            with open(input_path, 'r', encoding='latin-1') as f:
-                text_content = f.read()
-        
-        # Create PDF
-        pdf = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-        
-        # Container for PDF elements
-        story = []
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        
-        # Create a monospace style for code/text
-        # Senior Dev Tip: Monospace fonts preserve formatting for code
-        code_style = ParagraphStyle(
-            'Code',
-            parent=styles['Normal'],
-            fontName='Courier',
-            fontSize=10,
-            leading=12,
-            leftIndent=0,
-            rightIndent=0,
-            alignment=TA_LEFT
-        )
-        
-        # Split text into lines and add to PDF
-        lines = text_content.split('\n')
-        
-        for line in lines:
-            # Use Preformatted to preserve spacing
-            if line.strip():
-                p = Preformatted(line, code_style)
-                story.append(p)
-            else:
-                # Add spacing for empty lines
-                story.append(Spacer(1, 0.1 * inch))
-        
-        # Build PDF
-        pdf.build(story)
-        
+        output_dir = os.path.dirname(output_path)
+        size = os.path.getsize(input_path)
+        incremental = incremental and size >= HEAD_BYTES
+
+        with open(input_path, 'rb') as f:
+            head = f.read(HEAD_BYTES)
+
+            found = None
+            if incremental:
+                with span("checkpoint"):
+                    found = _load_checkpoint(f, output_dir, owner, head, size)
+
+            # Read text file with encoding detection
+            # Senior Dev Tip: Try UTF-8 first, fall back to other encodings
+            with span("decode"):
+                if found:
+                    f.seek(found[0]["last_page_offset"])
+                else:
+                    f.seek(0)
+                data = f.read()
+
+        encoding = found[0]["encoding"] if found else _detect_encoding(data)
+
+        # The first lines are all a thumbnail needs
+        if thumbnail:
+            with span("thumbnail"):
+                save_text_thumbnail(
+                    head.decode(encoding, errors='ignore').splitlines(),
+                    output_path,
+                    letter,
+                    margin=PAGE_MARGINS['topMargin']
+                )
+
+        if found:
+            try:
+                if _append_to_previous(found[0], found[1], data, output_path, owner, head):
+                    return output_path
+            except Exception as e:
+                # e.g. the previous output was cleaned up in the meantime
+                logger.warning(f"Incremental render failed, starting over: {e}")
+
+            # Previous output unusable after all - render the whole file
+            with open(input_path, 'rb') as f:
+                data = f.read()
+            encoding = _detect_encoding(data)
+
+        # Build PDF (layout and writing happen together inside build)
+        with span("layout"):
+            page_starts = _render(
+                _line_flowables(_read_lines(data, encoding)),
+                output_path
+            )
+
+        # Same bytes as the file would get when rendered in parts
+        with span("normalize"):
+            normalize_pdf(output_path)
+
+        if incremental:
+            _save_checkpoint(
+                output_path,
+                owner,
+                head,
+                encoding,
+                len(page_starts),
+                page_starts[-1],
+                hashlib.sha256(memoryview(data)[:page_starts[-1]]).hexdigest()
+            )
+
         logger.info(f"Successfully converted text to PDF: {output_path}")
         return output_path
-    
+
     except Exception as e:
         logger.error(f"Error converting text to PDF: {e}")
         raise Exception(f"Text to PDF conversion failed: {str(e)}")
+
+
+def plan_text_chunks(
+    input_path: str,
+    output_path: str,
+    max_chunks: int,
+    chunk_bytes: int,
+    incremental: bool = False,
+    owner: str = ANONYMOUS_CLIENT
+) -> Optional[dict]:
+    """
+    Split a large text file into ranges that can be rendered in parallel.
+
+    Every range starts on the first line of a page, so rendering the ranges
+    separately gives the same pages as rendering the file in one go.
+
+    Args:
+        input_path: Path to input text file
+        output_path: Path where the PDF will be saved
+        max_chunks: Most ranges to cut the file into
+        chunk_bytes: Least input bytes per range
+        incremental: Leave the file to the incremental renderer if it
+            continues an earlier render
+        owner: Client the conversion runs for (checkpoint lookup)
+
+    Returns:
+        Plan with the encoding, the (start, end) byte ranges and what an
+        incremental checkpoint needs, or None if the file should be
+        rendered in one piece
+
+    Raises:
+        Exception: If planning fails
+    """
+    try:
+        size = os.path.getsize(input_path)
+        chunks = min(max_chunks, size // chunk_bytes)
+        if chunks < 2:
+            return None
+
+        with open(input_path, 'rb') as f:
+            if incremental and size >= HEAD_BYTES:
+                with span("checkpoint"):
+                    # Appending a tail is cheaper than any parallel render
+                    head = f.read(HEAD_BYTES)
+                    if _load_checkpoint(f, os.path.dirname(output_path), owner, head, size):
+                        return None
+
+            with span("decode"):
+                f.seek(0)
+                data = f.read()
+
+        encoding = _detect_encoding(data)
+
+        with span("layout", {"text.predicted": True}):
+            page_starts = _predict_page_starts(_read_lines(data, encoding))
+
+        # Cut at the first page starting at or after each equal share
+        cuts = [0]
+        for index in range(1, chunks):
+            position = bisect_left(page_starts, size * index // chunks)
+            if position < len(page_starts) and page_starts[position] > cuts[-1]:
+                cuts.append(page_starts[position])
+
+        if len(cuts) < 2:
+            return None
+
+        return {
+            "encoding": encoding,
+            "ranges": list(zip(cuts, cuts[1:] + [size])),
+            "pages": len(page_starts),
+            "last_page_offset": page_starts[-1],
+            "prefix_sha256": hashlib.sha256(
+                memoryview(data)[:page_starts[-1]]
+            ).hexdigest() if incremental else None,
+        }
+
+    except Exception as e:
+        logger.error(f"Error planning text to PDF: {e}")
+        raise Exception(f"Text to PDF conversion failed: {str(e)}")
+
+
+def render_text_range(
+    input_path: str,
+    output_path: str,
+    start: int,
+    end: int,
+    encoding: str,
+    thumbnail: bool = False
+) -> str:
+    """
+    Render the lines in bytes [start, end) of a text file (see plan_text_chunks).
+
+    Args:
+        input_path: Path to input text file
+        output_path: Path where this range's PDF should be saved
+        start: Byte offset of the first line
+        end: Byte offset where the next range starts (or the file size)
+        encoding: Encoding chosen for the whole file
+        thumbnail: Also save a preview thumbnail next to the output
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If conversion fails
+    """
+    try:
+        with open(input_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            with span("decode", {"text.range_bytes": end - start}):
+                f.seek(start)
+                data = f.read(end - start)
+
+        if thumbnail:
+            with span("thumbnail"):
+                save_text_thumbnail(
+                    data[:HEAD_BYTES].decode(encoding, errors='ignore').splitlines(),
+                    output_path,
+                    letter,
+                    margin=PAGE_MARGINS['topMargin']
+                )
+
+        lines = _read_lines(data, encoding, start)
+        if end < size:
+            # The newline before `end` also yields an empty line at `end`,
+            # which is really the first line of the next range
+            lines = (item for item in lines if item[0] < end)
+
+        with span("layout"):
+            _render(_line_flowables(lines), output_path)
+
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error converting text range to PDF: {e}")
+        raise Exception(f"Text to PDF conversion failed: {str(e)}")
+
+
+def save_text_checkpoint(
+    input_path: str,
+    output_path: str,
+    plan: dict,
+    owner: str = ANONYMOUS_CLIENT
+) -> None:
+    """Leave an incremental checkpoint of owner's for a file rendered from a plan."""
+    with open(input_path, 'rb') as f:
+        head = f.read(HEAD_BYTES)
+
+    _save_checkpoint(
+        output_path,
+        owner,
+        head,
+        plan["encoding"],
+        plan["pages"],
+        plan["last_page_offset"],
+        plan["prefix_sha256"]
+    )
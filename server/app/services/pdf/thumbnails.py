@@ -0,0 +1,118 @@
+"""
+Preview Thumbnails
+
+Small PNG previews of the first page of a conversion result.
+
+Senior Dev Tip: Converters already hold page 1's content in memory
+(a decoded image, the first lines of text, the first rows of a sheet),
+so drawing a preview from that is far cheaper than rasterising the
+finished PDF afterwards. Thumbnails are best-effort: a failure is
+logged and never fails the conversion.
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+from typing import Iterable, List, Tuple
+from app.core.config import settings
+from app.utils.file_utils import get_thumbnail_path
+import textwrap
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _thumbnail_box() -> Tuple[int, int]:
+    return (settings.thumbnail_size, settings.thumbnail_size)
+
+
+def save_image_thumbnail(img: Image.Image, output_path: str) -> None:
+    """
+    Save a thumbnail of an already-decoded image.
+
+    The image is shrunk in place (Image.thumbnail), so only call this
+    once the caller is done with the full-size image.
+
+    Args:
+        img: Decoded Pillow image (page 1 content)
+        output_path: Path of the converted file the preview belongs to
+    """
+    try:
+        img.thumbnail(_thumbnail_box())
+        img.save(get_thumbnail_path(output_path), "PNG", optimize=True)
+    except Exception as e:
+        logger.warning(f"Could not create thumbnail for {output_path}: {e}")
+
+
+def save_text_thumbnail(
+    lines: Iterable[str],
+    output_path: str,
+    page_size: Tuple[float, float],
+    margin: float = 72,
+    line_height: float = 12
+) -> None:
+    """
+    Draw the first page of a text-like document as a thumbnail.
+
+    Args:
+        lines: Lines of page 1 (extra lines are ignored)
+        output_path: Path of the converted file the preview belongs to
+        page_size: PDF page size in points (width, height)
+        margin: Page margin in points
+        line_height: Distance between lines in points
+    """
+    try:
+        # Draw at one pixel per point so the layout matches the real
+        # page, then shrink
+        width, height = int(page_size[0]), int(page_size[1])
+        x = y = margin
+
+        page = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(page)
+        font = ImageFont.load_default()
+
+        for line in lines:
+            if y + line_height > height - margin:
+                break
+            draw.text((x, y), line, fill=0, font=font)
+            y += line_height
+
+        save_image_thumbnail(page, output_path)
+    except Exception as e:
+        logger.warning(f"Could not create thumbnail for {output_path}: {e}")
+
+
+def wrap_paragraphs(paragraphs: Iterable[str], width: int = 90, max_lines: int = 60) -> List[str]:
+    """Wrap paragraphs into at most max_lines preview lines."""
+    lines: List[str] = []
+    for paragraph in paragraphs:
+        lines.extend(textwrap.wrap(paragraph, width) or [""])
+        lines.append("")
+        if len(lines) >= max_lines:
+            break
+    return lines[:max_lines]
+
+
+def save_pdf_thumbnail(pdf_path: str, output_path: str, page: int = 1) -> None:
+    """
+    Rasterise one page (page 1 by default) of an existing PDF.
+
+    Used for PDF page operations, where there is no decoded content to
+    reuse. Needs poppler (via pdf2image); skipped quietly without it.
+
+    Args:
+        pdf_path: PDF to preview
+        output_path: Path of the converted file the preview belongs to
+        page: One-based page number to preview
+    """
+    try:
+        from pdf2image import convert_from_path
+
+        pages = convert_from_path(
+            pdf_path,
+            first_page=page,
+            last_page=page,
+            size=(settings.thumbnail_size, None)
+        )
+        if pages:
+            save_image_thumbnail(pages[0], output_path)
+    except Exception as e:
+        logger.info(f"Skipping PDF thumbnail for {output_path}: {e}")
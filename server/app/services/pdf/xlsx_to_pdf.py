@@ -0,0 +1,216 @@
+"""
+XLSX to PDF Conversion Service
+
+Converts Excel workbooks to PDF tables.
+
+Senior Dev Tip: Spreadsheets can be huge. openpyxl's read-only mode
+streams rows straight from the XML instead of building every cell
+object up front, and the story below is fed to ReportLab lazily, so
+only the rows for the table currently being laid out are in memory.
+"""
+
+from openpyxl import load_workbook
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, PageBreak
+from reportlab.lib.units import inch
+from app.services.pdf.styles import get_stylesheet, get_table_style
+from app.services.pdf.thumbnails import save_text_thumbnail
+from app.core.tracing import span
+from typing import Any, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows per table flowable. Small tables keep each layout step cheap and
+# let ReportLab release finished pages as it goes.
+ROWS_PER_TABLE = 50
+
+# Longer cell values are truncated so a single cell can't blow up a row
+MAX_CELL_CHARS = 60
+
+# Rows of the first sheet kept aside for the preview thumbnail
+PREVIEW_ROWS = 40
+
+
+class LazyStory:
+    """
+    List-like story that pulls flowables from an iterator on demand.
+
+    Senior Dev Tip: doc.build() only ever looks at the head of the story
+    (index, slice, del, insert), so a small look-ahead buffer in front of
+    a generator behaves like a list without materialising it.
+    """
+
+    def __init__(self, flowables: Iterable[Any], lookahead: int = 8):
+        self._source: Optional[Iterator[Any]] = iter(flowables)
+        self._buffer: List[Any] = []
+        self._lookahead = lookahead
+
+    def _fill(self) -> None:
+        while self._source is not None and len(self._buffer) < self._lookahead:
+            try:
+                self._buffer.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self) -> int:
+        self._fill()
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        self._fill()
+        return self._buffer[index]
+
+    def __setitem__(self, index, value) -> None:
+        self._buffer[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._buffer[index]
+
+    def insert(self, index: int, value: Any) -> None:
+        self._buffer.insert(index, value)
+
+
+def _format_cell(value: Any) -> str:
+    """Render a cell value as a short string."""
+    if value is None:
+        return ""
+    text = str(value)
+    if len(text) > MAX_CELL_CHARS:
+        text = text[:MAX_CELL_CHARS - 3] + "..."
+    return text
+
+
+def _make_table(header: List[str], rows: List[List[str]], width: float) -> Table:
+    """Build one table flowable, padding ragged rows to the same width."""
+    column_count = max([len(header)] + [len(row) for row in rows])
+    data = [
+        row + [""] * (column_count - len(row))
+        for row in [header] + rows
+    ]
+    table = Table(data, colWidths=[width / column_count] * column_count, repeatRows=1)
+    table.setStyle(get_table_style())
+    return table
+
+
+def _sheet_flowables(
+    worksheet,
+    width: float,
+    preview: Optional[List[List[str]]] = None
+) -> Iterator[Any]:
+    """
+    Yield table flowables for a worksheet, ROWS_PER_TABLE rows at a time.
+
+    If a preview list is given, the first PREVIEW_ROWS rows are also
+    collected into it as they stream past.
+    """
+    header: Optional[List[str]] = None
+    rows: List[List[str]] = []
+
+    for values in worksheet.iter_rows(values_only=True):
+        row = [_format_cell(value) for value in values]
+
+        # Drop trailing empty cells so sparse sheets stay narrow
+        while row and not row[-1]:
+            row.pop()
+
+        if preview is not None and len(preview) < PREVIEW_ROWS:
+            preview.append(row)
+
+        if header is None:
+            header = row or [""]
+            continue
+
+        rows.append(row)
+        if len(rows) >= ROWS_PER_TABLE:
+            yield _make_table(header, rows, width)
+            rows = []
+
+    if header is not None:
+        if rows:
+            yield _make_table(header, rows, width)
+        elif header != [""]:
+            yield _make_table(header, [], width)
+
+
+def _workbook_flowables(
+    workbook,
+    width: float,
+    preview: Optional[List[List[str]]] = None
+) -> Iterator[Any]:
+    """Yield the whole document: a heading and tables for every sheet."""
+    heading_style = get_stylesheet()['Heading2']
+
+    for index, worksheet in enumerate(workbook.worksheets):
+        if index > 0:
+            yield PageBreak()
+            # Only the first sheet is on page 1
+            preview = None
+        yield Paragraph(escape(worksheet.title), heading_style)
+        yield Spacer(1, 0.1 * inch)
+        yield from _sheet_flowables(worksheet, width, preview)
+
+
+def convert_xlsx_to_pdf(input_path: str, output_path: str, thumbnail: bool = False) -> str:
+    """
+    Convert an XLSX workbook to PDF.
+
+    Each worksheet starts on a new page with its name as a heading,
+    followed by its rows as tables (first row repeated as header).
+
+    Args:
+        input_path: Path to input XLSX file
+        output_path: Path where PDF should be saved
+        thumbnail: Also save a preview thumbnail next to the output
+
+    Returns:
+        Path to generated PDF file
+
+    Raises:
+        Exception: If conversion fails
+    """
+    workbook = None
+    try:
+        # read_only streams rows; data_only gives cached formula results
+        with span("decode"):
+            workbook = load_workbook(input_path, read_only=True, data_only=True)
+
+        # Landscape gives wide sheets more room
+        pdf = SimpleDocTemplate(
+            output_path,
+            pagesize=landscape(letter),
+            rightMargin=36,
+            leftMargin=36,
+            topMargin=36,
+            bottomMargin=36
+        )
+
+        # Rows are streamed, so the preview rows are captured on the way
+        preview: Optional[List[List[str]]] = [] if thumbnail else None
+
+        # Rows are read while they are laid out, so this span covers both
+        with span("layout"):
+            story = LazyStory(_workbook_flowables(workbook, pdf.width, preview))
+            pdf.build(story)
+
+        if preview:
+            with span("thumbnail"):
+                save_text_thumbnail(
+                    [workbook.worksheets[0].title, ""] + [" | ".join(row) for row in preview],
+                    output_path,
+                    landscape(letter),
+                    margin=36
+                )
+
+        logger.info(f"Successfully converted XLSX to PDF: {output_path}")
+        return output_path
+
+    except Exception as e:
+        logger.error(f"Error converting XLSX to PDF: {e}")
+        raise Exception(f"XLSX to PDF conversion failed: {str(e)}")
+
+    finally:
+        # Read-only workbooks keep the source file open until closed
+        if workbook is not None:
+            workbook.close()
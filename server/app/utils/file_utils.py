@@ -72,6 +72,33 @@ async def save_upload_file(upload_file: UploadFile, destination: str) -> str:
         raise
 
 
+def get_thumbnail_path(output_path: str) -> str:
+    """
+    Get the path of the preview thumbnail that belongs to an output file.
+    
+    Args:
+        output_path: Path to converted file
+        
+    Returns:
+        Path of its thumbnail (next to the output, same name + .thumb.png)
+    """
+    return os.path.splitext(output_path)[0] + ".thumb.png"
+
+
+def delete_output_file(output_path: str) -> bool:
+    """
+    Delete a converted file together with its thumbnail.
+    
+    Args:
+        output_path: Path to converted file
+        
+    Returns:
+        True if the output was deleted, False otherwise
+    """
+    delete_file(get_thumbnail_path(output_path))
+    return delete_file(output_path)
+
+
 def get_file_size(filepath: str) -> int:
     """
     Get file size in bytes.
@@ -127,13 +154,18 @@ def cleanup_old_files(directory: str, max_age_minutes: int = 30):
     
     try:
         for filename in os.listdir(directory):
+            # Leave hidden files alone (e.g. .gitkeep)
+            if filename.startswith('.'):
+                continue
+            
             filepath = os.path.join(directory, filename)
             
             if os.path.isfile(filepath):
                 file_age = now - os.path.getmtime(filepath)
                 
                 if file_age > max_age_seconds:
-                    delete_file(filepath)
+                    # Thumbnails go together with the file they preview
+                    delete_output_file(filepath)
                     logger.info(f"Cleaned up old file: {filename}")
     
     except Exception as e:
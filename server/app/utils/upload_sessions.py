@@ -0,0 +1,290 @@
+"""
+Resumable Upload Sessions
+
+Storage for chunked, resumable uploads (in the spirit of the tus protocol).
+
+Each session is two files in the sessions directory:
+- <id>.json: metadata (filename, conversion type, declared length)
+- <id>.part: the bytes received so far
+
+Senior Dev Tip: The size of the .part file *is* the upload offset. There
+is no separate counter to get out of sync, so if a connection drops in
+the middle of a chunk, everything that reached the disk is kept and the
+client simply resumes from the new offset. Because all state is on disk,
+any server process can serve any request of the session.
+
+Requests that change a session (append, convert, delete) hold an flock on
+its .part file, which serializes them across processes as well as within
+one. The lock goes away with the file descriptor, so nothing needs to be
+cleaned up after a session is gone.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import shutil
+import asyncio
+import aiofiles
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from app.core.config import settings
+from app.utils.file_utils import delete_file
+import logging
+
+logger = logging.getLogger(__name__)
+
+SESSION_DIR = os.path.join(settings.upload_dir, "sessions")
+
+# Upload IDs are uuid4 hex strings; anything else never touches the disk
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# How often a request waiting for a busy session tries the lock again
+_LOCK_POLL_SECONDS = 0.05
+
+os.makedirs(SESSION_DIR, exist_ok=True)
+
+
+class UploadOverflowError(Exception):
+    """Raised when a chunk would take the upload past its declared length."""
+
+
+def _meta_path(upload_id: str) -> str:
+    return os.path.join(SESSION_DIR, f"{upload_id}.json")
+
+
+def data_path(upload_id: str) -> str:
+    """Path of the file holding the bytes received so far."""
+    return os.path.join(SESSION_DIR, f"{upload_id}.part")
+
+
+def link_for_conversion(session: dict) -> str:
+    """
+    Give the received bytes a path with the upload's own extension.
+
+    Converters pick their parser from the extension (openpyxl refuses a
+    .part file outright), so the data is hard-linked next to the regular
+    uploads. The link shares the .part file's bytes; the caller deletes it
+    once the conversion is done.
+
+    Args:
+        session: Session metadata
+
+    Returns:
+        Path of the linked file
+    """
+    extension = os.path.splitext(session["filename"])[1].lower()
+    path = os.path.join(settings.upload_dir, f"{session['upload_id']}{extension}")
+
+    delete_file(path)
+    try:
+        os.link(data_path(session["upload_id"]), path)
+    except OSError:
+        # No hard links on this filesystem
+        shutil.copyfile(data_path(session["upload_id"]), path)
+    return path
+
+
+def create_session(filename: str, conversion_type: str, length: int, client_id: str) -> dict:
+    """
+    Create a new, empty upload session.
+
+    Args:
+        filename: Original filename (used for the output name)
+        conversion_type: Conversion to run once the upload is complete
+        length: Total upload size in bytes
+        client_id: Client that owns the session (see identify_client)
+
+    Returns:
+        Session metadata
+    """
+    upload_id = uuid.uuid4().hex
+    session = {
+        "upload_id": upload_id,
+        "filename": filename,
+        "conversion_type": conversion_type,
+        "length": length,
+        "client_id": client_id,
+        "created_at": time.time(),
+    }
+
+    # Create the data file first so a session never exists without one
+    open(data_path(upload_id), 'wb').close()
+    with open(_meta_path(upload_id), 'w') as f:
+        json.dump(session, f)
+
+    logger.info(f"Upload session created: {upload_id} ({length} bytes)")
+    return session
+
+
+def _last_activity(upload_id: str) -> float:
+    """Time of the last write to the session (creation or last chunk)."""
+    return max(
+        os.path.getmtime(_meta_path(upload_id)),
+        os.path.getmtime(data_path(upload_id))
+    )
+
+
+def expires_at(upload_id: str) -> float:
+    """Unix time after which an idle session is reclaimed."""
+    return _last_activity(upload_id) + settings.upload_session_ttl_minutes * 60
+
+
+def load_session(upload_id: str) -> Optional[dict]:
+    """
+    Load a session's metadata.
+
+    Returns:
+        Session metadata, or None if the ID is invalid, unknown or expired
+    """
+    if not _UPLOAD_ID_RE.match(upload_id):
+        return None
+
+    try:
+        with open(_meta_path(upload_id)) as f:
+            session = json.load(f)
+        expiry = expires_at(upload_id)
+    except (OSError, ValueError):
+        return None
+
+    if expiry < time.time():
+        delete_session(upload_id)
+        return None
+
+    return session
+
+
+@asynccontextmanager
+async def locked_session(upload_id: str) -> AsyncIterator[Optional[dict]]:
+    """
+    Hold a session's lock for the duration of the block.
+
+    The lock is polled instead of waited for in a thread, so a long
+    conversion of one upload can't tie up the thread pool with waiters.
+
+    Yields:
+        Session metadata, re-read under the lock, or None if the session
+        doesn't exist (any more) - e.g. deleted while we were waiting
+    """
+    if not _UPLOAD_ID_RE.match(upload_id):
+        yield None
+        return
+
+    try:
+        f = open(data_path(upload_id), 'rb')
+    except OSError:
+        yield None
+        return
+
+    try:
+        while True:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(_LOCK_POLL_SECONDS)
+
+        yield load_session(upload_id)
+    finally:
+        # Closing the file releases the lock
+        f.close()
+
+
+def _is_locked(upload_id: str) -> bool:
+    """Whether a request is working on the session right now."""
+    try:
+        with open(data_path(upload_id), 'rb') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    except OSError:
+        pass
+    return False
+
+
+def current_offset(upload_id: str) -> int:
+    """Number of bytes received so far."""
+    return os.path.getsize(data_path(upload_id))
+
+
+async def append_chunks(session: dict, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Append a request body to the session, chunk by chunk.
+
+    Chunks are written to the .part file as they arrive - nothing is
+    collected in memory first.
+
+    Args:
+        session: Session metadata
+        chunks: Async iterator over the request body
+
+    Returns:
+        The new offset
+
+    Raises:
+        UploadOverflowError: If the body goes past the declared length
+            (chunks before the overflowing one are kept)
+    """
+    upload_id = session["upload_id"]
+    offset = current_offset(upload_id)
+
+    async with aiofiles.open(data_path(upload_id), 'ab') as f:
+        async for chunk in chunks:
+            if offset + len(chunk) > session["length"]:
+                raise UploadOverflowError(
+                    f"Upload exceeds declared length of {session['length']} bytes"
+                )
+            await f.write(chunk)
+            offset += len(chunk)
+
+    return offset
+
+
+def delete_session(upload_id: str) -> None:
+    """Remove a session and its data."""
+    delete_file(data_path(upload_id))
+    delete_file(_meta_path(upload_id))
+
+
+def cleanup_expired_sessions() -> int:
+    """
+    Reclaim sessions that have been idle longer than the TTL.
+
+    Returns:
+        Number of sessions removed
+    """
+    removed = 0
+    now = time.time()
+
+    ttl_seconds = settings.upload_session_ttl_minutes * 60
+
+    try:
+        upload_ids = {os.path.splitext(name)[0] for name in os.listdir(SESSION_DIR)}
+
+        for upload_id in upload_ids:
+            if not _UPLOAD_ID_RE.match(upload_id):
+                continue
+
+            # Look at whichever files exist, so half-created or
+            # half-deleted sessions are reclaimed too
+            paths = [
+                path for path in (_meta_path(upload_id), data_path(upload_id))
+                if os.path.exists(path)
+            ]
+            if (
+                paths
+                and max(os.path.getmtime(path) for path in paths) + ttl_seconds < now
+                # e.g. a slow conversion of a session that expires meanwhile
+                and not _is_locked(upload_id)
+            ):
+                delete_session(upload_id)
+                removed += 1
+
+    except Exception as e:
+        logger.error(f"Error during upload session cleanup: {e}")
+
+    if removed:
+        logger.info(f"Reclaimed {removed} expired upload sessions")
+    return removed
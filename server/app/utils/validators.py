@@ -20,7 +20,12 @@ SUPPORTED_FORMATS = {
     "image_to_pdf": [".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"],
     "docx_to_pdf": [".docx"],
     "text_to_pdf": [".txt"],
+    "xlsx_to_pdf": [".xlsx"],
+    "pptx_to_pdf": [".pptx"],
     "pdf_to_image": [".pdf"],
+    "pdf_merge": [".pdf"],
+    "pdf_split": [".pdf"],
+    "pdf_extract_pages": [".pdf"],
 }
 
 
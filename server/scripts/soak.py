@@ -0,0 +1,408 @@
+"""
+Soak Test
+
+Drives the API in-process through a long stream of mixed conversions and
+watches for slow leaks. Every --sample-every conversions it records:
+
+- RSS and open file descriptors of the API process and of the workers
+- memory traced by tracemalloc in the API process
+- files left in upload_dir and output_dir
+
+Once the run is over, a least-squares slope (growth per 1000 conversions)
+is fitted to each metric after the warm-up, and the run fails if any
+slope is above its limit. The top tracemalloc growth since the end of the
+warm-up is printed to show where API-side memory went.
+
+Usage (from the server directory):
+    python -m scripts.soak --conversions 200000
+
+Senior Dev Tip: Each conversion's output is downloaded and then deleted,
+like a client that fetches its file before cleanup would. Anything still
+in upload_dir or output_dir afterwards was left behind by the app.
+Workers are never recycled during a soak (WORKER_MAX_TASKS is raised),
+so leaks inside converters show up in the worker metrics instead of
+being reset every few hundred tasks.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+# Metric -> which limit applies to it
+MEMORY_METRICS = ("rss_kb", "worker_rss_kb", "traced_kb")
+FD_METRICS = ("fds", "worker_fds")
+FILE_METRICS = ("upload_files", "output_files")
+
+
+@dataclass
+class Sample:
+    conversions: int
+    elapsed: float
+    metrics: Dict[str, float]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Soak test the conversion API for leaks")
+    parser.add_argument("--conversions", type=int, default=10000,
+                        help="Total conversions to run (default: 10000)")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="Stop after this many seconds (0 = no limit)")
+    parser.add_argument("--sample-every", type=int, default=100,
+                        help="Conversions between samples (default: 100)")
+    # Allocator pools and caches fill up first; that isn't a leak
+    parser.add_argument("--warmup", type=int, default=1000,
+                        help="Conversions ignored by the slope fit (default: 1000)")
+    parser.add_argument("--max-memory-slope", type=float, default=512,
+                        help="Allowed memory growth in KB per 1000 conversions (default: 512)")
+    parser.add_argument("--max-fd-slope", type=float, default=1,
+                        help="Allowed fd growth per 1000 conversions (default: 1)")
+    parser.add_argument("--max-file-slope", type=float, default=1,
+                        help="Allowed leftover file growth per 1000 conversions (default: 1)")
+    parser.add_argument("--max-errors", type=int, default=0,
+                        help="Allowed failed conversions (default: 0)")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Conversion worker processes (default: 2)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="tracemalloc entries to report (default: 10)")
+    parser.add_argument("--traceback-frames", type=int, default=1,
+                        help="Frames tracemalloc keeps per allocation (default: 1)")
+    parser.add_argument("--work-dir", default=None,
+                        help="Directory for uploads/outputs (default: a temp dir)")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace, work_dir: str) -> None:
+    """Settings are read at import time, so this runs before the app is imported."""
+    os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+    os.environ["OUTPUT_DIR"] = os.path.join(work_dir, "outputs")
+    os.environ["CONVERSION_WORKERS"] = str(args.workers)
+    os.environ["WORKER_MAX_TASKS"] = str(10 ** 9)
+    # Everything the soak uploads goes through the one-process engine
+    os.environ["LIBREOFFICE_POOL_SIZE"] = "0"
+
+
+def _proc_rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _proc_fds(pid: int) -> Optional[int]:
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return None
+
+
+def _file_count(directory: str) -> int:
+    return sum(
+        1
+        for _, _, files in os.walk(directory)
+        for name in files
+        if not name.startswith(".")
+    )
+
+
+def take_sample(conversions: int, started: float, upload_dir: str, output_dir: str) -> Sample:
+    # Pool workers are children of this process (LibreOffice daemons are not)
+    workers = [child.pid for child in multiprocessing.active_children()]
+
+    metrics = {
+        "rss_kb": _proc_rss_kb(os.getpid()),
+        "worker_rss_kb": sum(_proc_rss_kb(pid) or 0 for pid in workers),
+        "traced_kb": tracemalloc.get_traced_memory()[0] / 1024,
+        "fds": _proc_fds(os.getpid()),
+        "worker_fds": sum(_proc_fds(pid) or 0 for pid in workers),
+        "upload_files": _file_count(upload_dir),
+        "output_files": _file_count(output_dir),
+    }
+    return Sample(
+        conversions=conversions,
+        elapsed=time.monotonic() - started,
+        metrics={name: value for name, value in metrics.items() if value is not None}
+    )
+
+
+def slope_per_1000(samples: List[Sample], metric: str) -> Optional[float]:
+    """Least-squares growth of a metric per 1000 conversions."""
+    points = [(s.conversions, s.metrics[metric]) for s in samples if metric in s.metrics]
+    if len(points) < 3:
+        return None
+
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return covariance / variance * 1000
+
+
+# Inputs
+
+def make_inputs() -> Dict[str, Tuple[str, bytes]]:
+    """Small documents of every supported type, built with the same libraries the converters read them with."""
+    from PIL import Image
+    from docx import Document
+    from openpyxl import Workbook
+    from pptx import Presentation
+    from reportlab.pdfgen import canvas
+
+    inputs = {}
+
+    buffer = io.BytesIO()
+    Image.new("RGBA", (400, 300), (30, 120, 200, 128)).save(buffer, "PNG")
+    inputs["png"] = ("photo.png", buffer.getvalue())
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 80, 40)).save(buffer, "JPEG")
+    inputs["jpeg"] = ("photo.jpg", buffer.getvalue())
+
+    doc = Document()
+    for index in range(30):
+        doc.add_paragraph(f"Paragraph {index}: " + "soak test text " * 12)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    inputs["docx"] = ("report.docx", buffer.getvalue())
+
+    text = "\n".join(f"{index:05d} INFO request handled in {index % 97} ms" for index in range(300))
+    inputs["txt"] = ("server.txt", text.encode())
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "name", "qty", "price", "total", "note"])
+    for index in range(50):
+        sheet.append([index, f"item {index}", index % 7, 1.5 * index, index * 1.5 * (index % 7), "ok"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    inputs["xlsx"] = ("sheet.xlsx", buffer.getvalue())
+
+    presentation = Presentation()
+    for index in range(3):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = f"Slide {index + 1}"
+        slide.placeholders[1].text = "First point\nSecond point"
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+    inputs["pptx"] = ("deck.pptx", buffer.getvalue())
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for index in range(3):
+        pdf.drawString(72, 720, f"Page {index + 1}")
+        pdf.showPage()
+    pdf.save()
+    inputs["pdf"] = ("document.pdf", buffer.getvalue())
+
+    return inputs
+
+
+# Scenarios: each runs one conversion and returns the output filename
+
+def build_scenarios(client, inputs: Dict[str, Tuple[str, bytes]]) -> List[Tuple[str, Callable[[], str]]]:
+    def convert(kind: str, conversion_type: str, **form) -> Callable[[], str]:
+        def run() -> str:
+            filename, data = inputs[kind]
+            response = client.post(
+                "/api/v1/convert",
+                data={"conversion_type": conversion_type, **form},
+                files={"file": (filename, data)}
+            )
+            return _output_filename(response)
+        return run
+
+    def merge() -> str:
+        filename, data = inputs["pdf"]
+        response = client.post(
+            "/api/v1/convert/merge",
+            files=[("files", (filename, data)), ("files", (filename, data))]
+        )
+        return _output_filename(response)
+
+    def resumable(kind: str, conversion_type: str, **body) -> Callable[[], str]:
+        def run() -> str:
+            filename, data = inputs[kind]
+            response = client.post("/api/v1/uploads", json={
+                "filename": filename,
+                "length": len(data),
+                "conversion_type": conversion_type
+            })
+            _check(response, 201)
+            upload_url = response.json()["upload_url"]
+
+            # Two chunks, like a client resuming after a dropped connection
+            middle = len(data) // 2
+            for offset, chunk in ((0, data[:middle]), (middle, data[middle:])):
+                _check(client.patch(upload_url, content=chunk, headers={"Upload-Offset": str(offset)}), 204)
+
+            response = client.post(f"{upload_url}/convert", json=body)
+            return _output_filename(response)
+        return run
+
+    return [
+        ("image_png", convert("png", "image_to_pdf")),
+        ("image_jpeg", convert("jpeg", "image_to_pdf")),
+        ("docx", convert("docx", "docx_to_pdf", engine="reportlab")),
+        ("text", convert("txt", "text_to_pdf")),
+        ("xlsx", convert("xlsx", "xlsx_to_pdf")),
+        ("pptx", convert("pptx", "pptx_to_pdf")),
+        ("pdf_split", convert("pdf", "pdf_split", page_ranges="1,2-3")),
+        ("pdf_extract", convert("pdf", "pdf_extract_pages", page_ranges="2")),
+        ("pdf_merge", merge),
+        ("resumable_docx", resumable("docx", "docx_to_pdf", engine="reportlab")),
+        ("resumable_xlsx", resumable("xlsx", "xlsx_to_pdf")),
+    ]
+
+
+class ConversionFailed(Exception):
+    pass
+
+
+def _check(response, expected: int) -> None:
+    if response.status_code != expected:
+        raise ConversionFailed(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+def _output_filename(response) -> str:
+    _check(response, 200)
+    return response.json()["output_filename"]
+
+
+def fetch_and_delete(client, output_dir: str, output_filename: str) -> None:
+    """Download the result (and its preview), then delete both like cleanup would."""
+    from app.utils.file_utils import delete_output_file
+
+    _check(client.get(f"/api/v1/convert/download/{output_filename}"), 200)
+    # Not every output has a preview (PDF operations need poppler)
+    response = client.get(f"/api/v1/convert/thumbnail/{output_filename}")
+    if response.status_code != 404:
+        _check(response, 200)
+
+    delete_output_file(os.path.join(output_dir, output_filename))
+
+
+# Report
+
+def report(samples: List[Sample], args: argparse.Namespace) -> bool:
+    """Print the slope of every metric; returns True if all are within limits."""
+    fitted = [s for s in samples if s.conversions >= args.warmup]
+    limits = {
+        **{metric: args.max_memory_slope for metric in MEMORY_METRICS},
+        **{metric: args.max_fd_slope for metric in FD_METRICS},
+        **{metric: args.max_file_slope for metric in FILE_METRICS},
+    }
+
+    print(f"\nGrowth per 1000 conversions ({len(fitted)} samples after warm-up):")
+    ok = True
+    for metric, limit in limits.items():
+        slope = slope_per_1000(fitted, metric)
+        if slope is None:
+            print(f"  {metric:<15} n/a")
+            continue
+
+        within = slope <= limit
+        ok = ok and within
+        first, last = fitted[0].metrics.get(metric), fitted[-1].metrics.get(metric)
+        print(
+            f"  {metric:<15} {slope:>12.2f}  (limit {limit:g}, "
+            f"{first:.0f} -> {last:.0f})  {'ok' if within else 'FAIL'}"
+        )
+    return ok
+
+
+def main() -> int:
+    args = parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="soak-")
+    configure_environment(args, work_dir)
+
+    # Imported only now, so the settings above are picked up
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.main import app
+
+    tracemalloc.start(args.traceback_frames)
+    snapshot_filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ]
+
+    inputs = make_inputs()
+    samples: List[Sample] = []
+    failures: Dict[str, int] = {}
+    baseline = None
+    done = 0
+
+    print(f"Soaking {args.conversions} conversions in {work_dir}")
+
+    with TestClient(app) as client:
+        scenarios = build_scenarios(client, inputs)
+        started = time.monotonic()
+        samples.append(take_sample(0, started, settings.upload_dir, settings.output_dir))
+
+        while done < args.conversions:
+            if args.duration and time.monotonic() - started > args.duration:
+                break
+
+            name, scenario = scenarios[done % len(scenarios)]
+            try:
+                fetch_and_delete(client, settings.output_dir, scenario())
+            except ConversionFailed as e:
+                failures[name] = failures.get(name, 0) + 1
+                if failures[name] == 1:
+                    print(f"  {name} failed: {e}")
+            done += 1
+
+            if done == args.warmup:
+                baseline = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+
+            if done % args.sample_every == 0:
+                sample = take_sample(done, started, settings.upload_dir, settings.output_dir)
+                samples.append(sample)
+                m = sample.metrics
+                print(
+                    f"{done:>9}  {done / sample.elapsed:6.1f}/s  "
+                    f"rss={m.get('rss_kb', 0) / 1024:.1f}MB "
+                    f"workers={m.get('worker_rss_kb', 0) / 1024:.1f}MB "
+                    f"traced={m['traced_kb'] / 1024:.1f}MB "
+                    f"fds={m.get('fds', '-')}/{m.get('worker_fds', '-')} "
+                    f"files={m['upload_files']}/{m['output_files']}"
+                )
+
+    ok = report(samples, args)
+
+    if baseline is not None:
+        current = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+        print(f"\nTop {args.top} tracemalloc growth since warm-up:")
+        for stat in current.compare_to(baseline, "lineno")[:args.top]:
+            print(f"  {stat}")
+
+    errors = sum(failures.values())
+    if errors:
+        print(f"\nFailed conversions: {failures}")
+    if errors > args.max_errors:
+        ok = False
+
+    print(f"\n{'PASS' if ok else 'FAIL'} after {done} conversions")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())